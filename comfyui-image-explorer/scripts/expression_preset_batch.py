@@ -1,391 +1,522 @@
-# scripts/expression_preset_batch.py
-
-from __future__ import annotations
-
-import argparse
-import itertools
-import json
-import logging
-
-# src を import パスに追加（scripts直叩き用）
-import sys
-from pathlib import Path
-from typing import Iterable, List
-
-sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
-
-from comfytools.comfyui_client import ComfyUIClient
-from comfytools.utils import (
-    ensure_directory,
-    generate_run_id,
-    generate_seed,
-    safe_filename,
-    setup_logging,
-)
-from dtrace_loging.logging.trace import trace_io
-from expression_preset_batch.config.config_loader import (
-    quick_load,
-)
-from expression_preset_batch.config.workflow import (
-    EPBWorkflowManager,
-)
-from expression_preset_batch.models import (
-    GenerationParams,
-    SamplerParams,
-)
-
-logger = logging.getLogger(__name__)
-
-
-DEFAULT_EXTS = [".png", ".jpg", ".jpeg", ".webp"]
-
-
-@trace_io(level=logging.DEBUG)
-def iter_image_files(
-    images_dir: Path, *, recursive: bool, exts: List[str]
-) -> Iterable[Path]:
-    exts_norm = {e.lower() for e in exts}
-    if recursive:
-        for p in images_dir.rglob("*"):
-            if p.is_file() and p.suffix.lower() in exts_norm:
-                yield p
-    else:
-        for p in images_dir.iterdir():
-            if p.is_file() and p.suffix.lower() in exts_norm:
-                yield p
-
-
-@trace_io(level=logging.DEBUG)
-def compute_seed(strategy: str, base: int, index: int) -> int:
-    if strategy == "time":
-        return int(generate_seed())
-    if strategy == "fixed":
-        return int(base)
-    # increment
-    return int(base) + int(index)
-
-
-@trace_io(level=logging.DEBUG)
-def _fmt_float(x: float, digits: int = 3) -> str:
-    # 0.320 -> "0.32", 8.000 -> "8"
-    s = f"{x:.{digits}f}".rstrip("0").rstrip(".")
-    return s if s else "0"
-
-
-@trace_io(level=logging.DEBUG)
-def render_prefix(
-    template: str,
-    *,
-    image_stem: str,
-    expr: str,
-    run_id: str,
-    seed: int,
-    steps: int | None = None,
-    cfg: float | None = None,
-    denoise: float | None = None,
-    sampler: str | None = None,
-    scheduler: str | None = None,
-) -> str:
-    # 使える変数: {image} {expr} {run} {seed}
-    # 追加: {steps} {cfg} {denoise} {sampler} {scheduler}
-    values: dict[str, object] = {
-        "image": safe_filename(image_stem),
-        "expr": safe_filename(expr),
-        "run": safe_filename(run_id),
-        "seed": seed,
-    }
-
-    # テンプレートに使う場合に備えて、値がある時だけ入れる
-    if steps is not None:
-        values["steps"] = int(steps)
-    if cfg is not None:
-        values["cfg"] = _fmt_float(float(cfg), digits=3)
-    if denoise is not None:
-        values["denoise"] = _fmt_float(float(denoise), digits=3)
-    if sampler is not None:
-        values["sampler"] = safe_filename(str(sampler))
-    if scheduler is not None:
-        values["scheduler"] = safe_filename(str(scheduler))
-
-    # テンプレート側に {steps} などがあるのに values に無い場合は KeyError で気付ける
-    return template.format(**values)
-
-
-@trace_io(level=logging.DEBUG)
-def write_meta_json(path: Path, meta: dict) -> None:
-    ensure_directory(path.parent)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(meta, f, ensure_ascii=False, indent=2, sort_keys=True)
-
-
-@trace_io(level=logging.DEBUG)
-def parse_args() -> argparse.Namespace:
-    p = argparse.ArgumentParser(
-        description="ExpressionPresetNode-based batch runner for ComfyUI"
-    )
-    p.add_argument(
-        "-c",
-        "--config",
-        type=str,
-        default="config/epb.yaml",
-        help="Config YAML/JSON path",
-    )
-    p.add_argument(
-        "-i", "--images-dir", type=str, required=True, help="Input images directory"
-    )
-    p.add_argument("--recursive", action="store_true", help="Search images recursively")
-    p.add_argument(
-        "--limit", type=int, default=0, help="Process only first N images (0=all)"
-    )
-    p.add_argument(
-        "--dry-run",
-        action="store_true",
-        help="Do not call ComfyUI API (show planned actions)",
-    )
-    p.add_argument("--verbose", action="store_true", help="Enable debug logging")
-    p.add_argument("--log-file", type=Path, help="ログをファイルに出力")
-    return p.parse_args()
-
-
-@trace_io(level=logging.DEBUG)
-def main() -> int:
-    args = parse_args()
-    # ロギング設定（ルートロガーを設定）
-    log_level = logging.DEBUG if args.verbose else logging.INFO
-    setup_logging(level=log_level, log_file=args.log_file)
-    # setup_logging(debug=args.verbose)
-
-    config_path = Path(args.config).resolve()
-    images_dir = Path(args.images_dir).resolve()
-
-    if not images_dir.exists() or not images_dir.is_dir():
-        logger.error("images-dir not found or not a directory: %s", images_dir)
-        return 2
-
-    cfg = quick_load(config_path)
-
-    run = cfg["run"]
-    wfref = cfg["workflow"]
-    input_image_cfg = cfg["input_image"]
-    expr_mapping = cfg["expression_preset"]
-    expressions = cfg["expressions"]
-    save_image_cfg = cfg["save_image"]
-    seed_node_cfg = cfg["seed_node"]
-    sampler_node_cfg = cfg["sampler_node"]
-
-    client = ComfyUIClient(base_url=run.comfy_url)
-
-    if not client.is_alive():
-        logger.error("ComfyUI is not reachable: %s", run.comfy_url)
-        return 3
-
-    mgr = EPBWorkflowManager(
-        workflow_json=wfref.workflow_json,
-        expression_node=expr_mapping,
-        input_image_node_id=input_image_cfg["node_id"],
-        input_image_input_name=input_image_cfg.get("input_name", "image"),
-        save_image_nodes=cfg["save_image"]["nodes"],
-        seed_node_id=seed_node_cfg.get("node_id"),
-        seed_input_name=seed_node_cfg.get("input_name", "seed") or "seed",
-        sampler_node_id=sampler_node_cfg.get("node_id") if sampler_node_cfg else None,
-        steps_input_name=sampler_node_cfg.get("steps_input", "steps")
-        if sampler_node_cfg
-        else "steps",
-        cfg_input_name=sampler_node_cfg.get("cfg_input", "cfg")
-        if sampler_node_cfg
-        else "cfg",
-        denoise_input_name=sampler_node_cfg.get("denoise_input", "denoise")
-        if sampler_node_cfg
-        else "denoise",
-        sampler_name_input_name=sampler_node_cfg.get(
-            "sampler_name_input", "sampler_name"
-        )
-        if sampler_node_cfg
-        else "sampler_name",
-        scheduler_input_name=sampler_node_cfg.get("scheduler_input", "scheduler")
-        if sampler_node_cfg
-        else "scheduler",
-    )
-
-    exts = DEFAULT_EXTS
-    files = list(iter_image_files(images_dir, recursive=args.recursive, exts=exts))
-    if args.limit and args.limit > 0:
-        files = files[: args.limit]
-
-    if not files:
-        logger.warning("No image files found in %s", images_dir)
-        return 0
-
-    logger.info(
-        "Found %d images. expressions=%d repeats=%d",
-        len(files),
-        len(expressions),
-        run.repeats,
-    )
-
-    seed_counter = 0
-
-    for img_path in files:
-        image_stem = img_path.stem
-        logger.info("=== Image: %s ===", img_path.name)
-
-        # 1) upload（必要なら）
-        if input_image_cfg.get("upload", True):
-            if args.dry_run:
-                uploaded_name = img_path.name
-                logger.info("[dry-run] upload_image: %s -> %s", img_path, uploaded_name)
-            else:
-                resp = client.upload_image(
-                    img_path,
-                    name=None,  # Noneなら元ファイル名
-                    image_type=input_image_cfg.get("upload_type", "input"),
-                    subfolder=input_image_cfg.get("upload_subfolder", ""),
-                    overwrite=bool(input_image_cfg.get("overwrite", False)),
-                )
-                if not resp.success:
-                    logger.error("upload failed: %s", resp.error_message)
-                    continue
-                uploaded_name = resp.data.get("name")
-                if not uploaded_name:
-                    logger.error("upload response missing name: %s", resp.data)
-                    continue
-        else:
-            # ComfyUIサーバ側 input/ に既に存在している前提
-            uploaded_name = img_path.name
-
-        # 2) expression loop
-        sweep = cfg["sampler_sweep"]  # 追加
-        sampler_node_cfg = cfg["sampler_node"]  # 追加
-
-        logger.error("sampler_sweep: %s", sweep)
-        # 候補が無ければ “1通り” 扱いにして既存挙動維持
-        if sweep:
-            combos = list(
-                itertools.product(
-                    sweep.get("steps", []),
-                    sweep.get("cfg", []),
-                    sweep.get("denoise", []),
-                    sweep.get("sampler", []),
-                    sweep.get("scheduler", []),
-                )
-            )
-        else:
-            combos = [(None, None, None, None, None)]
-
-        logger.info(
-            "Found %d images. expressions=%d repeats=%d sampler_combos=%d",
-            len(files),
-            len(expressions),
-            run.repeats,
-            len(combos),
-        )
-
-        for expr in expressions:
-            for steps, cfgv, denoise, sampler_name, scheduler in combos:
-                sampler_params = None
-                if steps is not None:
-                    sampler_params = SamplerParams(
-                        steps=int(steps),
-                        cfg=float(cfgv),
-                        denoise=float(denoise),
-                        sampler_name=str(sampler_name),
-                        scheduler=str(scheduler),
-                    )
-
-                for r in range(run.repeats):
-                    run_id = generate_run_id()
-                    seed = compute_seed(
-                        run.seed_strategy, run.seed_base, seed_counter
-                    )
-                    seed_counter += 1
-
-                    prefix_template = (
-                        save_image_cfg.get("filename_prefix_template")
-                        or "{image}/{expr}/{run}/img"
-                    )
-                    filename_prefix = render_prefix(
-                        prefix_template,
-                        image_stem=image_stem,
-                        expr=expr,
-                        run_id=run_id,
-                        seed=seed,
-                        steps=steps,
-                        cfg=cfgv,
-                        denoise=denoise,
-                        sampler=sampler_name,
-                        scheduler=scheduler,
-                    )
-
-                    params = GenerationParams(
-                        expression=expr,
-                        seed=seed,
-                        filename_prefix=filename_prefix,
-                        sampler=sampler_params,
-                    )
-
-                    meta = {
-                        "tool": "expression_preset_batch",
-                        "input": {
-                            "local_path": str(img_path),
-                            "uploaded_name": uploaded_name,
-                        },
-                        "expression": expr,
-                        "repeat_index": r,
-                        "seed": seed,
-                        "filename_prefix": filename_prefix,
-                        "workflow_json": str(wfref.workflow_json),
-                    }
-
-                    # メタ保存先（ローカル側のログ/再実行用）
-                    meta_dir = (
-                        Path(cfg["output_root"])
-                        / safe_filename(image_stem)
-                        / safe_filename(expr)
-                        / safe_filename(run_id)
-                    )
-                    meta_path = meta_dir / "meta.json"
-
-                    if args.dry_run:
-                        logger.info(
-                            "[dry-run] would run: expr=%s seed=%s prefix=%s",
-                            expr,
-                            seed,
-                            filename_prefix,
-                        )
-                        write_meta_json(meta_path, {**meta, "dry_run": True})
-                        continue
-
-                    # workflow生成（B案: 入力画像/expr/seed/prefix を workflow.py が反映） # noqa: E501
-                    workflow = mgr.create_workflow(
-                        params, input_image_filename=uploaded_name
-                    )
-
-                    # 実行
-                    result = client.execute_and_wait(
-                        workflow=workflow,
-                        poll_interval=run.poll_interval,
-                        max_wait_time=run.timeout_sec,
-                    )
-
-                    meta["success"] = bool(result.success)
-                    if result.success:
-                        meta["history"] = (
-                            result.data
-                        )  # /history のレスポンス（サイズが大きい場合は要注意）
-                        logger.info("done: expr=%s seed=%s", expr, seed)
-                    else:
-                        meta["error"] = result.error_message
-                        logger.error(
-                            "failed: expr=%s seed=%s err=%s",
-                            expr,
-                            seed,
-                            result.error_message,
-                        )
-
-            write_meta_json(meta_path, meta)
-
-    return 0
-
-
-if __name__ == "__main__":
-    raise SystemExit(main())
+# scripts/expression_preset_batch.py
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import logging
+import os
+
+# src を import パスに追加（scripts直叩き用）
+import sys
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from comfytools.comfyui_client import ComfyUIClient, ComfyUIResponse
+from comfytools.utils import (
+    calculate_combinations_count,
+    ensure_directory,
+    generate_seed,
+    iter_combinations,
+    iter_run_ids,
+    safe_filename,
+    setup_logging,
+    write_json,
+)
+from dtrace_loging.logging.trace import trace_io
+from expression_preset_batch.config.config_loader import (
+    quick_load,
+)
+from expression_preset_batch.config.workflow import (
+    EPBWorkflowManager,
+)
+from expression_preset_batch.models import (
+    GenerationParams,
+    SamplerParams,
+)
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_EXTS = [".png", ".jpg", ".jpeg", ".webp"]
+# iter_image_files で比較に使う形（先頭の "." を除いた小文字）に正規化済みのもの
+_DEFAULT_EXTS_NORM = frozenset(e.lstrip(".") for e in DEFAULT_EXTS)
+
+
+# ジェネレータなので trace_io では生成時しか計測できず、付けても意味がない
+def iter_image_files(  # pylint: disable=missing-trace-io
+    images_dir: Path, *, recursive: bool, exts: Iterable[str] | None = None
+) -> Iterable[Path]:
+    # 拡張子は先頭の "." を除いた小文字で比較する（既定値は正規化済み）
+    if exts is None:
+        exts_norm = _DEFAULT_EXTS_NORM
+    else:
+        exts_norm = frozenset(e.lower().lstrip(".") for e in exts)
+    # os.scandir の DirEntry はファイル種別を持っているので、
+    # エントリごとに stat を発行せずに判定できる。
+    # サブディレクトリは再帰呼び出しではなくスタックで辿る
+    stack = [os.fspath(images_dir)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append(entry.path)
+                elif entry.is_file():
+                    stem, _, ext = entry.name.rpartition(".")
+                    if stem and ext.lower() in exts_norm:
+                        yield Path(entry.path)
+
+
+@trace_io(level=logging.DEBUG)
+def make_seed_fn(strategy: str, base: int) -> Callable[[int], int]:
+    # strategy の判定は実行前に1回だけ行い、ジョブごとには
+    # 通し番号から seed を返すだけの関数を呼ぶ
+    base = int(base)
+    if strategy == "time":
+        return lambda index: generate_seed()
+    if strategy == "fixed":
+        return lambda index: base
+    # increment
+    return lambda index: base + index
+
+
+# ジョブごとに呼ばれる小さな純関数なので trace_io は付けない
+def _fmt_float(x: float, digits: int = 3) -> str:  # pylint: disable=missing-trace-io
+    # 0.320 -> "0.32", 8.000 -> "8"
+    s = f"{x:.{digits}f}".rstrip("0").rstrip(".")
+    return s if s else "0"
+
+
+# ジョブごとに呼ばれるため trace_io は付けない（入力は meta.json に残る）
+def render_prefix(  # pylint: disable=missing-trace-io
+    template: str,
+    *,
+    image_stem: str,
+    expr: str,
+    run_id: str,
+    seed: int,
+    steps: int | None = None,
+    cfg: float | None = None,
+    denoise: float | None = None,
+    sampler: str | None = None,
+    scheduler: str | None = None,
+) -> str:
+    # 使える変数: {image} {expr} {run} {seed}
+    # 追加: {steps} {cfg} {denoise} {sampler} {scheduler}
+    values: dict[str, object] = {
+        "image": safe_filename(image_stem),
+        "expr": safe_filename(expr),
+        "run": safe_filename(run_id),
+        "seed": seed,
+    }
+
+    # テンプレートに使う場合に備えて、値がある時だけ入れる
+    if steps is not None:
+        values["steps"] = int(steps)
+    if cfg is not None:
+        values["cfg"] = _fmt_float(float(cfg), digits=3)
+    if denoise is not None:
+        values["denoise"] = _fmt_float(float(denoise), digits=3)
+    if sampler is not None:
+        values["sampler"] = safe_filename(str(sampler))
+    if scheduler is not None:
+        values["scheduler"] = safe_filename(str(scheduler))
+
+    # テンプレート側に {steps} などがあるのに values に無い場合は KeyError で気付ける
+    return template.format(**values)
+
+
+@trace_io(level=logging.DEBUG)
+def write_meta_json(
+    path: Path,
+    meta: dict,
+    history: dict | None = None,
+    ensured_dirs: Set[str] | None = None,
+) -> None:
+    # 書き込みスレッドで実行されるため、I/O の失敗は例外にせずログに残す
+    # （それ以外の例外は Future 経由で投入ループ側から送出される）
+    try:
+        ensure_directory(path.parent, ensured_dirs)
+        write_json(path, meta, sort_keys=True)
+        # /history のレスポンスは大きいので、別ファイルにインデントなしで書く
+        if history is not None:
+            write_json(path.with_name("history.json"), history, indent=False)
+    except OSError as e:
+        logger.error("meta.json write failed: %s: %s", path, e)
+
+
+@trace_io(level=logging.DEBUG)
+def extract_output_files(history: dict) -> List[str]:
+    # /history/{prompt_id} のレスポンスから出力画像の相対パスを集める
+    # 例: ["alice/neutral_00001_.png"]（ComfyUI の output type 配下）
+    files: List[str] = []
+    for entry in history.values():
+        for node_output in (entry.get("outputs") or {}).values():
+            for image in node_output.get("images", []):
+                subfolder = image.get("subfolder") or ""
+                filename = image.get("filename", "")
+                files.append(f"{subfolder}/{filename}" if subfolder else filename)
+    return files
+
+
+@trace_io(level=logging.DEBUG)
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="ExpressionPresetNode-based batch runner for ComfyUI"
+    )
+    p.add_argument(
+        "-c",
+        "--config",
+        type=str,
+        default="config/epb.yaml",
+        help="Config YAML/JSON path",
+    )
+    p.add_argument(
+        "-i", "--images-dir", type=str, required=True, help="Input images directory"
+    )
+    p.add_argument("--recursive", action="store_true", help="Search images recursively")
+    p.add_argument(
+        "--limit", type=int, default=0, help="Process only first N images (0=all)"
+    )
+    p.add_argument(
+        "--concurrency",
+        type=int,
+        default=0,
+        help="Max prompts queued on ComfyUI at once (0=run.pipeline_depth)",
+    )
+    p.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Do not call ComfyUI API (show planned actions)",
+    )
+    p.add_argument("--verbose", action="store_true", help="Enable debug logging")
+    p.add_argument("--log-file", type=Path, help="ログをファイルに出力")
+    return p.parse_args()
+
+
+@trace_io(level=logging.DEBUG)
+def main() -> int:
+    args = parse_args()
+    # ロギング設定（ルートロガーを設定）
+    log_level = logging.DEBUG if args.verbose else logging.INFO
+    setup_logging(level=log_level, log_file=args.log_file)
+    # setup_logging(debug=args.verbose)
+
+    # 絶対パス化は文字列処理だけで行い、resolve() のようにパスの各要素を
+    # stat してシンボリックリンクを辿ることはしない
+    config_path = Path(os.path.abspath(args.config))
+    images_dir = Path(os.path.abspath(args.images_dir))
+
+    if not images_dir.is_dir():
+        logger.error("images-dir not found or not a directory: %s", images_dir)
+        return 2
+
+    cfg = quick_load(config_path)
+
+    run = cfg["run"]
+    wfref = cfg["workflow"]
+    input_image_cfg = cfg["input_image"]
+    expr_mapping = cfg["expression_preset"]
+    expressions = cfg["expressions"]
+    save_image_cfg = cfg["save_image"]
+    seed_node_cfg = cfg["seed_node"]
+    sampler_node_cfg = cfg["sampler_node"]
+
+    # --limit 指定時は N 枚見つかった時点で走査を打ち切る
+    image_iter = iter_image_files(images_dir, recursive=args.recursive)
+    if args.limit and args.limit > 0:
+        image_iter = itertools.islice(image_iter, args.limit)
+    files = list(image_iter)
+
+    if not files:
+        logger.warning("No image files found in %s", images_dir)
+        return 0
+
+    # --concurrency 指定時は設定ファイルの pipeline_depth より優先する
+    pipeline_depth = args.concurrency if args.concurrency > 0 else run.pipeline_depth
+
+    # HTTPセッション/WebSocketは全ジョブで1つを使い回し、終了時に閉じる
+    client = ComfyUIClient(
+        base_url=run.comfy_url,
+        max_poll_interval=run.max_poll_interval,
+        pipeline_depth=pipeline_depth,
+    )
+
+    if not client.is_alive():
+        logger.error("ComfyUI is not reachable: %s", run.comfy_url)
+        client.close()
+        return 3
+
+    mgr = EPBWorkflowManager(
+        workflow_json=wfref.workflow_json,
+        expression_node=expr_mapping,
+        input_image_node_id=input_image_cfg.node_id,
+        input_image_input_name=input_image_cfg.input_name,
+        save_image_nodes=[dict(entry) for entry in save_image_cfg["nodes"]],
+        seed_node_id=seed_node_cfg.get("node_id"),
+        seed_input_name=seed_node_cfg.get("input_name", "seed") or "seed",
+        sampler_node_id=sampler_node_cfg.get("node_id") if sampler_node_cfg else None,
+        steps_input_name=sampler_node_cfg.get("steps_input", "steps")
+        if sampler_node_cfg
+        else "steps",
+        cfg_input_name=sampler_node_cfg.get("cfg_input", "cfg")
+        if sampler_node_cfg
+        else "cfg",
+        denoise_input_name=sampler_node_cfg.get("denoise_input", "denoise")
+        if sampler_node_cfg
+        else "denoise",
+        sampler_name_input_name=sampler_node_cfg.get(
+            "sampler_name_input", "sampler_name"
+        )
+        if sampler_node_cfg
+        else "sampler_name",
+        scheduler_input_name=sampler_node_cfg.get("scheduler_input", "scheduler")
+        if sampler_node_cfg
+        else "scheduler",
+    )
+
+    # サンプラーの候補は画像によらず共通なので、画像ループの外で一度だけ用意する
+    sweep = cfg["sampler_sweep"]
+    logger.debug("sampler_sweep: %s", sweep)
+    # 候補が無ければ “1通り” 扱いにして既存挙動維持
+    # 組み合わせはリスト化せず、候補から都度復元する
+    if sweep:
+        sweep_pools = (
+            sweep.get("steps", []),
+            sweep.get("cfg", []),
+            sweep.get("denoise", []),
+            sweep.get("sampler", []),
+            sweep.get("scheduler", []),
+        )
+    else:
+        sweep_pools = ((None,),) * 5
+    combo_count = calculate_combinations_count(*map(len, sweep_pools))
+
+    logger.info(
+        "Found %d images. expressions=%d repeats=%d sampler_combos=%d",
+        len(files),
+        len(expressions),
+        run.repeats,
+        combo_count,
+    )
+
+    io_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="meta-io")
+    # 書き込みスレッドで起きた例外を投入ループ側で送出するため、
+    # 結果を確かめるまで Future を保持する
+    meta_writes: Deque[Future] = deque()
+    # meta.json の保存先で作成済みのディレクトリ（この実行の中だけで使う）
+    ensured_dirs: Set[str] = set()
+
+    # 画像のアップロードは生成ループに入る前にまとめて並列投入しておき、
+    # 各画像のジョブ生成時に完了を待つ（前の画像の生成中に次の画像が届く）
+    upload_executor = ThreadPoolExecutor(
+        max_workers=min(run.upload_workers, len(files)), thread_name_prefix="upload"
+    )
+    upload_futures: Dict[Path, Future] = {}
+    # requests.Session はスレッド間で共有して安全とは保証されていないため、
+    # アップロードスレッドは投入/待機用の client とは別に、スレッドごとの
+    # クライアント（セッション）を使う
+    upload_clients: List[ComfyUIClient] = []
+    upload_local = threading.local()
+
+    @trace_io(level=logging.DEBUG)
+    def upload_one(path: Path) -> ComfyUIResponse:
+        uploader = getattr(upload_local, "client", None)
+        if uploader is None:
+            uploader = ComfyUIClient(base_url=run.comfy_url, use_websocket=False)
+            upload_local.client = uploader
+            upload_clients.append(uploader)
+        return uploader.upload_image(
+            path,
+            name=None,  # Noneなら元ファイル名
+            image_type=input_image_cfg.upload_type,
+            subfolder=input_image_cfg.upload_subfolder,
+            overwrite=input_image_cfg.overwrite,
+        )
+
+    if input_image_cfg.upload and not args.dry_run:
+        upload_futures = {p: upload_executor.submit(upload_one, p) for p in files}
+
+    # ジェネレータなので trace_io では生成時しか計測できず、付けても意味がない
+    def iter_jobs(  # pylint: disable=missing-trace-io
+    ) -> Iterator[Tuple[Tuple[dict, Path], dict]]:
+        """
+        1ジョブずつ ((メタ情報, メタ保存先), ワークフロー) を生成する
+
+        execute_pipelined から必要な分だけ引き出されるため、
+        ワークフロー生成は投入直前まで遅延される（アップロードは事前に並列投入済み）。
+        dry-run ではメタ情報だけ書き出し、ジョブは生成しない。
+        """
+        seed_counter = 0
+        seed_fn = make_seed_fn(run.seed_strategy, run.seed_base)
+        run_ids = iter_run_ids()
+        # メタ保存先は文字列で組み立て、Path はジョブごとに1回だけ作る
+        output_root = os.fspath(cfg["output_root"])
+        workflow_json = str(wfref.workflow_json)
+        prefix_template = (
+            save_image_cfg.get("filename_prefix_template") or "{image}/{expr}/{run}/img"
+        )
+
+        for img_path in files:
+            image_stem = img_path.stem
+            image_dir = os.path.join(output_root, safe_filename(image_stem))
+            logger.info("=== Image: %s ===", img_path.name)
+
+            # 1) upload（必要なら）
+            if input_image_cfg.upload:
+                if args.dry_run:
+                    uploaded_name = img_path.name
+                    logger.info(
+                        "[dry-run] upload_image: %s -> %s", img_path, uploaded_name
+                    )
+                else:
+                    resp = upload_futures[img_path].result()
+                    if not resp.success:
+                        logger.error("upload failed: %s", resp.error_message)
+                        continue
+                    uploaded_name = resp.data.get("name")
+                    if not uploaded_name:
+                        logger.error("upload response missing name: %s", resp.data)
+                        continue
+            else:
+                # ComfyUIサーバ側 input/ に既に存在している前提
+                uploaded_name = img_path.name
+
+            # 2) expression loop
+            for expr in expressions:
+                expr_dir = os.path.join(image_dir, safe_filename(expr))
+                for steps, cfgv, denoise, sampler_name, scheduler in iter_combinations(
+                    sweep_pools
+                ):
+                    sampler_params = None
+                    if steps is not None:
+                        sampler_params = SamplerParams(
+                            steps=int(steps),
+                            cfg=float(cfgv),
+                            denoise=float(denoise),
+                            sampler_name=str(sampler_name),
+                            scheduler=str(scheduler),
+                        )
+
+                    for r in range(run.repeats):
+                        run_id = next(run_ids)
+                        seed = seed_fn(seed_counter)
+                        seed_counter += 1
+
+                        filename_prefix = render_prefix(
+                            prefix_template,
+                            image_stem=image_stem,
+                            expr=expr,
+                            run_id=run_id,
+                            seed=seed,
+                            steps=steps,
+                            cfg=cfgv,
+                            denoise=denoise,
+                            sampler=sampler_name,
+                            scheduler=scheduler,
+                        )
+
+                        params = GenerationParams(
+                            expression=expr,
+                            seed=seed,
+                            filename_prefix=filename_prefix,
+                            sampler=sampler_params,
+                        )
+
+                        meta = {
+                            "tool": "expression_preset_batch",
+                            "input": {
+                                "local_path": str(img_path),
+                                "uploaded_name": uploaded_name,
+                            },
+                            "expression": expr,
+                            "repeat_index": r,
+                            "seed": seed,
+                            "filename_prefix": filename_prefix,
+                            "workflow_json": workflow_json,
+                        }
+
+                        # メタ保存先（ローカル側のログ/再実行用）
+                        meta_path = Path(
+                            os.path.join(expr_dir, safe_filename(run_id), "meta.json")
+                        )
+
+                        if args.dry_run:
+                            logger.info(
+                                "[dry-run] would run: expr=%s seed=%s prefix=%s",
+                                expr,
+                                seed,
+                                filename_prefix,
+                            )
+                            # dry-run ではメタ情報が唯一の出力なので、ログと同期して書く
+                            write_meta_json(
+                                meta_path, {**meta, "dry_run": True}, None, ensured_dirs
+                            )
+                            continue
+
+                        # workflow生成（B案: 入力画像/expr/seed/prefix を workflow.py が反映） # noqa: E501
+                        workflow = mgr.create_workflow(
+                            params, input_image_filename=uploaded_name
+                        )
+                        yield (meta, meta_path), workflow
+
+    # 実行（pipeline_depth 件まで先行投入し、投入順に完了を受け取る）
+    # meta.json の書き込みは書き込みスレッドに任せ、投入ループを止めない
+    try:
+        with client, io_executor:
+            for (meta, meta_path), result in client.execute_pipelined(
+                iter_jobs(),
+                pipeline_depth=pipeline_depth,
+                poll_interval=run.poll_interval,
+                max_wait_time=run.timeout_sec,
+                # history.json を保存しないなら、出力画像は WebSocket の通知から
+                # 拾い、ジョブごとの /history 取得を省く
+                fetch_history=run.save_history,
+            ):
+                meta["success"] = bool(result.success)
+                if result.success:
+                    # /history のレスポンス全体は大きいので、出力画像のパスだけ残す
+                    meta["prompt_id"] = next(iter(result.data), None)
+                    meta["outputs"] = extract_output_files(result.data)
+                    logger.info(
+                        "done: expr=%s seed=%s", meta["expression"], meta["seed"]
+                    )
+                else:
+                    meta["error"] = result.error_message
+                    logger.error(
+                        "failed: expr=%s seed=%s err=%s",
+                        meta["expression"],
+                        meta["seed"],
+                        result.error_message,
+                    )
+
+                history = (
+                    result.data if result.success and run.save_history else None
+                )
+                meta_writes.append(
+                    io_executor.submit(
+                        write_meta_json, meta_path, meta, history, ensured_dirs
+                    )
+                )
+                while meta_writes and meta_writes[0].done():
+                    meta_writes.popleft().result()
+        # with を抜けた時点で書き込みは全て終わっている
+        for future in meta_writes:
+            future.result()
+    finally:
+        # Ctrl-C や例外で抜けた場合に、未着手のアップロードを待たずに終了する
+        upload_executor.shutdown(wait=True, cancel_futures=True)
+        for uploader in upload_clients:
+            uploader.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,392 +1,487 @@
-"""
-ComfyUI画像生成ツール - メインプログラム
-すべてのモジュールを統合し、画像生成を実行する
-"""
-
-import argparse
-import logging
-import random
-import sys
-import time
-from pathlib import Path
-from typing import Optional
-
-# srcパスを追加
-sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
-
-
-from comfytools.comfyui_client import ComfyUIClient
-from comfytools.core_models import GenerationParams
-from comfytools.utils import (
-    ensure_directory,
-    estimate_time_remaining,
-    format_duration,
-    generate_run_id,
-    generate_seed,
-    print_progress_bar,
-    setup_logging,
-)
-from image_explorer.config.config_loader import ConfigLoader
-from image_explorer.config.workflow import WorkflowManager
-from image_explorer.prompt_builder import ParameterCombinationGenerator, PromptBuilder
-from image_explorer.state_manager import StateManager, print_progress
-
-# ロガー
-logger = logging.getLogger(__name__)
-
-
-class ImageGenerationRunner:
-    """
-    画像生成の実行を管理するクラス
-    各種マネージャーを統合してメインロジックを実行
-    """
-
-    def __init__(self, config_path: Path):
-        """
-        Args:
-            config_path: 設定ファイルのパス
-        """
-        logger.info("=" * 60)
-        logger.info("ComfyUI画像生成ツールを起動します")
-        logger.info("=" * 60)
-
-        # 設定を読み込み
-        logger.info(f"設定ファイルを読み込み中: {config_path}")
-        loader = ConfigLoader(config_path)
-        self.config = loader.load_all()
-
-        # 各種マネージャーを初期化
-        self._initialize_managers()
-
-        logger.info("初期化が完了しました")
-
-    def _initialize_managers(self):
-        """各種マネージャーを初期化"""
-        # StateManager
-        self.state_manager = StateManager(self.config["execution"].state_file)
-
-        # WorkflowManager
-        self.workflow_manager = WorkflowManager(self.config["workflow"])
-
-        # ComfyUIClient
-        self.client = ComfyUIClient(
-            base_url=self.config["execution"].comfy_url, timeout=30
-        )
-
-        # PromptBuilder
-        self.prompt_builder = PromptBuilder(
-            self.config["prompt_template"],
-            randomize_non_target=self.config["execution"].randomize_non_target,
-        )
-
-        # ParameterCombinationGenerator
-        self.param_generator = ParameterCombinationGenerator(
-            self.prompt_builder,
-            self.config["sampler_choices"],
-            self.config["lora_choices"],
-        )
-
-        logger.info("すべてのマネージャーを初期化しました")
-
-    def check_comfyui_connection(self) -> bool:
-        """
-        ComfyUIへの接続を確認
-
-        Returns:
-            bool: 接続できればTrue
-        """
-        logger.info("ComfyUIへの接続を確認中...")
-
-        if self.client.is_alive():
-            logger.info("✓ ComfyUIに接続しました")
-            return True
-        else:
-            logger.error("✗ ComfyUIに接続できません")
-            logger.error(f"  URL: {self.config['execution'].comfy_url}")
-            logger.error("  ComfyUIが起動しているか確認してください")
-            return False
-
-    def select_target_axis(self) -> Optional[str]:
-        """
-        探索する軸を選択
-
-        Returns:
-            str or None: 軸の名前、すべて使い切った場合はNone
-        """
-        all_axes = self.config["prompt_template"].get_axis_names()
-        remaining = self.state_manager.get_remaining_axes(all_axes)
-
-        if not remaining:
-            logger.info("すべての軸を探索完了しました！")
-            return None
-
-        # ランダムに選択
-        target_axis = random.choice(remaining)
-        logger.info(f"探索軸を選択: {target_axis}")
-
-        return target_axis
-
-    def calculate_generation_count(self, target_axis: str) -> int:
-        """
-        生成される画像の総数を計算
-
-        Args:
-            target_axis: 探索対象の軸名
-
-        Returns:
-            int: 生成される画像の総数
-        """
-        base_count = self.param_generator.count_combinations(target_axis)
-        repeats = self.config["execution"].repeats
-        total = base_count * repeats
-
-        logger.info(f"生成数: {base_count} パターン × {repeats} 回 = {total} 枚")
-
-        return total
-
-    def run_generation(self, target_axis: str):
-        """
-        画像生成を実行
-
-        Args:
-            target_axis: 探索対象の軸名
-        """
-        # 出力ルートを作成
-        output_root = self.config["workflow"].output_root
-        ensure_directory(output_root)
-
-        # 生成数を計算
-        base_count = self.param_generator.count_combinations(target_axis)
-        repeats = self.config["execution"].repeats
-        total_images = base_count * repeats
-
-        logger.info("")
-        logger.info("=" * 60)
-        logger.info("画像生成を開始します")
-        logger.info(f"  探索軸: {target_axis}")
-        logger.info(f"  パターン数: {base_count}")
-        logger.info(f"  繰り返し: {repeats}")
-        logger.info(f"  合計生成数: {total_images}")
-        logger.info("=" * 60)
-        logger.info("")
-
-        # 統計情報
-        start_time = time.time()
-        completed_images = 0
-        failed_images = 0
-
-        # パラメータを生成して実行
-        for i, params in enumerate(
-            self.param_generator.generate_combinations(target_axis), start=1
-        ):
-            run_id = generate_run_id(i)
-            run_dir = ensure_directory(output_root / run_id)
-
-            logger.info(f"パターン {i}/{base_count}: {run_id}")
-
-            # メタデータを保存
-            self._save_metadata(run_dir, params)
-
-            # 繰り返し実行
-            for r in range(repeats):
-                # Seedを生成
-                params.sampler.seed = generate_seed()
-
-                # ワークフローを作成
-                workflow = self.workflow_manager.create_configured_workflow(params)
-                self.workflow_manager.set_filename_prefix(workflow, f"{run_id}/img")
-
-                # ComfyUIに送信して実行
-                logger.debug(
-                    f"  繰り返し {r + 1}/{repeats} - Seed: {params.sampler.seed}"
-                )
-                response = self.client.execute_and_wait(
-                    workflow, poll_interval=self.config["execution"].poll_interval
-                )
-
-                if response.success:
-                    completed_images += 1
-                    logger.debug(f"  ✓ 完了 ({r + 1}/{repeats})")
-                else:
-                    failed_images += 1
-                    logger.error(f"  ✗ エラー: {response.error_message}")
-
-            logger.info(f"✓ {run_id} 完了")
-
-            # 進捗を表示
-            elapsed = time.time() - start_time
-            remaining_time = estimate_time_remaining(
-                completed_images, total_images, elapsed
-            )
-
-            print_progress_bar(
-                completed_images,
-                total_images,
-                prefix="進捗:",
-                suffix=f"完了 (残り約{remaining_time})",
-            )
-
-        # 完了
-        total_time = time.time() - start_time
-
-        logger.info("")
-        logger.info("=" * 60)
-        logger.info("画像生成が完了しました")
-        logger.info(f"  成功: {completed_images} 枚")
-        logger.info(f"  失敗: {failed_images} 枚")
-        logger.info(f"  所要時間: {format_duration(total_time)}")
-        logger.info("=" * 60)
-
-        # 軸を使用済みとしてマーク
-        self.state_manager.mark_as_used(target_axis)
-        logger.info(f"軸 '{target_axis}' を使用済みとしてマークしました")
-
-    def _save_metadata(self, run_dir: Path, params: GenerationParams):
-        """
-        メタデータをJSONファイルに保存
-
-        Args:
-            run_dir: 実行ディレクトリ
-            params: 生成パラメータ
-        """
-        import json
-
-        metadata_path = run_dir / "params.json"
-        metadata = params.to_dict()
-
-        try:
-            with open(metadata_path, "w", encoding="utf-8") as f:
-                json.dump(metadata, f, ensure_ascii=False, indent=2)
-            logger.debug(f"メタデータを保存: {metadata_path}")
-        except Exception as e:
-            logger.error(f"メタデータの保存に失敗: {e}")
-
-    def show_progress(self):
-        """現在の進捗を表示"""
-        all_axes = self.config["prompt_template"].get_axis_names()
-        print_progress(self.state_manager, all_axes)
-
-    def run(self) -> int:
-        """
-        メイン実行
-
-        Returns:
-            int: 終了コード (0: 成功, 1: エラー)
-        """
-        try:
-            # 進捗を表示
-            self.show_progress()
-
-            # ComfyUI接続確認
-            if not self.check_comfyui_connection():
-                return 1
-
-            # ワークフローを検証
-            if not self.workflow_manager.validate_workflow(
-                self.workflow_manager.get_base_workflow()
-            ):
-                logger.error("ワークフローの検証に失敗しました")
-                return 1
-
-            # 探索する軸を選択
-            target_axis = self.select_target_axis()
-            if target_axis is None:
-                logger.info("すべての軸を探索完了しました！")
-                return 0
-
-            # 生成数を計算
-            self.calculate_generation_count(target_axis)
-
-            # 実行確認
-            response = input("\n実行しますか？ (y/n): ")
-            if response.lower() != "y":
-                logger.info("キャンセルされました")
-                return 0
-
-            # 画像生成を実行
-            self.run_generation(target_axis)
-
-            # 完了後の進捗を表示
-            print("\n")
-            self.show_progress()
-
-            return 0
-
-        except KeyboardInterrupt:
-            logger.warning("\n中断されました")
-            return 1
-        except Exception as e:
-            logger.error(f"予期しないエラーが発生しました: {e}", exc_info=True)
-            return 1
-
-
-# ====== コマンドライン引数の処理 ======
-
-
-def parse_arguments():
-    """コマンドライン引数をパース"""
-    parser = argparse.ArgumentParser(
-        description="ComfyUI画像生成ツール - 複数のプロンプトパラメータを探索"
-    )
-
-    parser.add_argument(
-        "-c",
-        "--config",
-        type=Path,
-        default=Path("config/explorer.yaml"),
-        help="設定ファイルのパス (デフォルト: config.yaml)",
-    )
-
-    parser.add_argument(
-        "-p", "--progress", action="store_true", help="進捗のみ表示して終了"
-    )
-
-    parser.add_argument("-v", "--verbose", action="store_true", help="詳細なログを表示")
-
-    parser.add_argument("--log-file", type=Path, help="ログをファイルに出力")
-
-    return parser.parse_args()
-
-
-# ====== エントリーポイント ======
-
-
-def main():
-    """メインエントリーポイント"""
-    # コマンドライン引数をパース
-    args = parse_arguments()
-
-    # ロギング設定（ルートロガーを設定）
-    log_level = logging.DEBUG if args.verbose else logging.INFO
-    setup_logging(level=log_level, log_file=args.log_file)
-
-    # 設定ファイルの存在確認
-    if not args.config.exists():
-        logger.error(f"設定ファイルが見つかりません: {args.config}")
-        return 1
-
-    try:
-        # Runnerを作成
-        runner = ImageGenerationRunner(args.config)
-
-        # 進捗のみ表示モード
-        if args.progress:
-            runner.show_progress()
-            return 0
-
-        # メイン実行
-        return runner.run()
-
-    except FileNotFoundError as e:
-        logger.error(f"ファイルが見つかりません: {e}")
-        return 1
-    except ValueError as e:
-        logger.error(f"設定エラー: {e}")
-        return 1
-    except Exception as e:
-        logger.error(f"予期しないエラー: {e}", exc_info=True)
-        return 1
-
-
-if __name__ == "__main__":
-    sys.exit(main())
+"""
+ComfyUI画像生成ツール - メインプログラム
+すべてのモジュールを統合し、画像生成を実行する
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# srcパスを追加
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+
+from comfytools.comfyui_client import ComfyUIClient
+from comfytools.core_models import GenerationParams
+from comfytools.utils import (
+    ensure_directory,
+    estimate_time_remaining,
+    format_duration,
+    generate_run_id,
+    generate_seed,
+    print_progress_bar,
+    setup_logging,
+    write_json,
+)
+from image_explorer.config.config_loader import ConfigLoader
+from image_explorer.config.workflow import WorkflowManager
+from image_explorer.prompt_builder import ParameterCombinationGenerator, PromptBuilder
+from image_explorer.state_manager import StateManager, print_progress
+
+# ロガー
+logger = logging.getLogger(__name__)
+
+
+class ImageGenerationRunner:
+    """
+    画像生成の実行を管理するクラス
+    各種マネージャーを統合してメインロジックを実行
+    """
+
+    def __init__(self, config_path: Path, auto_confirm: bool = False):
+        """
+        Args:
+            config_path: 設定ファイルのパス
+            auto_confirm: 実行確認をスキップするか
+        """
+        self.auto_confirm = auto_confirm
+
+        logger.info("=" * 60)
+        logger.info("ComfyUI画像生成ツールを起動します")
+        logger.info("=" * 60)
+
+        # 設定を読み込み
+        logger.info("設定ファイルを読み込み中: %s", config_path)
+        loader = ConfigLoader(config_path)
+        self.config = loader.load_all()
+
+        # 各種マネージャーを初期化
+        self._initialize_managers()
+
+        logger.info("初期化が完了しました")
+
+    def _initialize_managers(self):
+        """各種マネージャーを初期化"""
+        # StateManager
+        self.state_manager = StateManager(self.config["execution"].state_file)
+
+        # WorkflowManager
+        self.workflow_manager = WorkflowManager(self.config["workflow"])
+
+        # ComfyUIClient
+        self.client = ComfyUIClient(
+            base_url=self.config["execution"].comfy_url,
+            timeout=30,
+            max_poll_interval=self.config["execution"].max_poll_interval,
+            pipeline_depth=self.config["execution"].pipeline_depth,
+        )
+
+        # PromptBuilder
+        self.prompt_builder = PromptBuilder(
+            self.config["prompt_template"],
+            randomize_non_target=self.config["execution"].randomize_non_target,
+            seed=self.config["execution"].random_seed,
+        )
+
+        # ParameterCombinationGenerator
+        self.param_generator = ParameterCombinationGenerator(
+            self.prompt_builder,
+            self.config["sampler_choices"],
+            self.config["lora_choices"],
+        )
+
+        # メタデータ書き込み用（ファイル作成の待ち時間を投入処理から外す）
+        self._io_executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="meta-io"
+        )
+
+        logger.info("すべてのマネージャーを初期化しました")
+
+    def check_comfyui_connection(self) -> bool:
+        """
+        ComfyUIへの接続を確認
+
+        Returns:
+            bool: 接続できればTrue
+        """
+        logger.info("ComfyUIへの接続を確認中...")
+
+        if self.client.is_alive():
+            logger.info("✓ ComfyUIに接続しました")
+            return True
+        else:
+            logger.error("✗ ComfyUIに接続できません")
+            logger.error("  URL: %s", self.config["execution"].comfy_url)
+            logger.error("  ComfyUIが起動しているか確認してください")
+            return False
+
+    def select_target_axis(self) -> Optional[str]:
+        """
+        探索する軸を選択
+
+        Returns:
+            str or None: 軸の名前、すべて使い切った場合はNone
+        """
+        all_axes = self.config["prompt_template"].get_axis_names()
+        remaining = self.state_manager.get_remaining_axes(all_axes)
+
+        if not remaining:
+            logger.info("すべての軸を探索完了しました！")
+            return None
+
+        # ランダムに選択（random_seed指定時は再現可能）
+        target_axis = self.prompt_builder.rng.choice(remaining)
+        logger.info("探索軸を選択: %s", target_axis)
+
+        return target_axis
+
+    def calculate_generation_count(
+        self, target_axis: str, base_count: Optional[int] = None
+    ) -> int:
+        """
+        生成される画像の総数を計算
+
+        Args:
+            target_axis: 探索対象の軸名
+            base_count: 計算済みのパターン数（省略時は計算する）
+
+        Returns:
+            int: 生成される画像の総数
+        """
+        if base_count is None:
+            base_count = self.param_generator.count_combinations(target_axis)
+        repeats = self.config["execution"].repeats
+        total = base_count * repeats
+
+        logger.info("生成数: %s パターン × %s 回 = %s 枚", base_count, repeats, total)
+
+        return total
+
+    def run_generation(self, target_axis: str, base_count: Optional[int] = None):
+        """
+        画像生成を実行
+
+        Args:
+            target_axis: 探索対象の軸名
+            base_count: 計算済みのパターン数（省略時は計算する）
+        """
+        # 出力ルートを作成
+        output_root = self.config["workflow"].output_root
+        ensure_directory(output_root)
+
+        # 生成数を計算
+        if base_count is None:
+            base_count = self.param_generator.count_combinations(target_axis)
+        repeats = self.config["execution"].repeats
+        total_images = base_count * repeats
+
+        logger.info("")
+        logger.info("=" * 60)
+        logger.info("画像生成を開始します")
+        logger.info("  探索軸: %s", target_axis)
+        logger.info("  パターン数: %s", base_count)
+        logger.info("  繰り返し: %s", repeats)
+        logger.info("  合計生成数: %s", total_images)
+        logger.info("=" * 60)
+        logger.info("")
+
+        # 出力ディレクトリを先にまとめて作成
+        run_ids = self._prepare_run_dirs(output_root, base_count)
+
+        # 統計情報
+        start_time = time.time()
+        completed_images = 0
+        failed_images = 0
+
+        # パラメータを生成して実行（先行投入でComfyUIのキューを切らさない）
+        execution = self.config["execution"]
+        results = self.client.execute_pipelined(
+            self._iter_jobs(target_axis, output_root, run_ids, repeats),
+            pipeline_depth=execution.pipeline_depth,
+            poll_interval=execution.poll_interval,
+            # 出力は params.json 側で管理しているので履歴本体は不要
+            fetch_history=False,
+        )
+
+        for (run_id, r), response in results:
+            if response.success:
+                completed_images += 1
+                logger.debug("  ✓ 完了 %s (%s/%s)", run_id, r + 1, repeats)
+            else:
+                failed_images += 1
+                logger.error("  ✗ エラー: %s", response.error_message)
+
+            if r < repeats - 1:
+                continue
+
+            logger.info("✓ %s 完了", run_id)
+
+            # 進捗を表示（失敗した分も処理済みとして数え、最後に必ず total に達する）
+            processed_images = completed_images + failed_images
+            elapsed = time.time() - start_time
+            remaining_time = estimate_time_remaining(
+                processed_images, total_images, elapsed
+            )
+
+            print_progress_bar(
+                processed_images,
+                total_images,
+                prefix="進捗:",
+                suffix=f"完了 (残り約{remaining_time})",
+            )
+
+        # 完了
+        total_time = time.time() - start_time
+
+        logger.info("")
+        logger.info("=" * 60)
+        logger.info("画像生成が完了しました")
+        logger.info("  成功: %s 枚", completed_images)
+        logger.info("  失敗: %s 枚", failed_images)
+        logger.info("  所要時間: %s", format_duration(total_time))
+        logger.info("=" * 60)
+
+        # 軸を使用済みとしてマーク
+        self.state_manager.mark_as_used(target_axis)
+        logger.info("軸 '%s' を使用済みとしてマークしました", target_axis)
+
+    def _iter_jobs(
+        self, target_axis: str, output_root: Path, run_ids: List[str], repeats: int
+    ) -> Iterator[Tuple[Tuple[str, int], Dict[str, Any]]]:
+        """
+        投入するワークフローを1件ずつ生成する
+
+        パイプライン側から必要になった時点で取り出されるため、
+        全ワークフローを事前にメモリへ展開しない。
+
+        Args:
+            target_axis: 探索対象の軸名
+            output_root: 出力ルートディレクトリ
+            run_ids: パターンごとの実行ID（ディレクトリ作成済み）
+            repeats: 1パターンあたりの繰り返し回数
+
+        Yields:
+            Tuple[Tuple[str, int], Dict[str, Any]]:
+                ((run_id, 繰り返し番号), ワークフロー)
+        """
+        base_count = len(run_ids)
+        for i, (run_id, params) in enumerate(
+            zip(run_ids, self.param_generator.generate_combinations(target_axis)),
+            start=1,
+        ):
+            run_dir = output_root / run_id
+
+            logger.info("パターン %s/%s: %s", i, base_count, run_id)
+
+            # メタデータを保存
+            self._save_metadata(run_dir, params)
+
+            # 繰り返し実行
+            for r in range(repeats):
+                # Seedを生成
+                params.sampler.seed = generate_seed(self.prompt_builder.rng)
+
+                # ワークフローを作成
+                workflow = self.workflow_manager.create_configured_workflow(params)
+                self.workflow_manager.set_filename_prefix(workflow, f"{run_id}/img")
+
+                logger.debug(
+                    "  繰り返し %s/%s - Seed: %s", r + 1, repeats, params.sampler.seed
+                )
+                yield (run_id, r), workflow
+
+    @staticmethod
+    def _prepare_run_dirs(output_root: Path, count: int) -> List[str]:
+        """
+        実行IDを採番し、出力ディレクトリを生成ループの前にまとめて作成する
+
+        Args:
+            output_root: 出力ルートディレクトリ（作成済み）
+            count: パターン数
+
+        Returns:
+            List[str]: 実行IDのリスト
+        """
+        run_ids = [generate_run_id(i) for i in range(1, count + 1)]
+        for run_id in run_ids:
+            # 親は作成済みなので、存在確認(stat)を伴う mkdir(parents=True) は使わない
+            try:
+                os.mkdir(output_root / run_id)
+            except FileExistsError:
+                pass
+        return run_ids
+
+    def _save_metadata(self, run_dir: Path, params: GenerationParams):
+        """
+        メタデータをJSONファイルに保存
+
+        Args:
+            run_dir: 実行ディレクトリ
+            params: 生成パラメータ
+        """
+        metadata_path = run_dir / "params.json"
+        # paramsは後でseedが書き換わるため、辞書化はここで行う
+        self._io_executor.submit(
+            self._write_metadata_file, metadata_path, params.to_dict()
+        )
+
+    @staticmethod
+    def _write_metadata_file(metadata_path: Path, metadata: Dict[str, Any]):
+        """
+        メタデータをJSONファイルに書き込む（書き込みスレッドで実行）
+
+        Args:
+            metadata_path: 出力先パス
+            metadata: メタデータ
+        """
+        try:
+            write_json(metadata_path, metadata)
+            logger.debug("メタデータを保存: %s", metadata_path)
+        except Exception as e:
+            logger.error("メタデータの保存に失敗: %s", e)
+
+    def show_progress(self):
+        """現在の進捗を表示"""
+        all_axes = self.config["prompt_template"].get_axis_names()
+        print_progress(self.state_manager, all_axes)
+
+    def run(self) -> int:
+        """
+        メイン実行
+
+        Returns:
+            int: 終了コード (0: 成功, 1: エラー)
+        """
+        try:
+            # 進捗を表示
+            self.show_progress()
+
+            # ComfyUI接続確認
+            if not self.check_comfyui_connection():
+                return 1
+
+            # ワークフローを検証
+            if not self.workflow_manager.validate_workflow():
+                logger.error("ワークフローの検証に失敗しました")
+                return 1
+
+            # 探索する軸を選択
+            target_axis = self.select_target_axis()
+            if target_axis is None:
+                logger.info("すべての軸を探索完了しました！")
+                return 0
+
+            # 生成数を計算（確認表示と実行で同じ値を使う）
+            base_count = self.param_generator.count_combinations(target_axis)
+            self.calculate_generation_count(target_axis, base_count)
+
+            # 実行確認（-y指定時・非対話実行時はスキップ）
+            if not self.auto_confirm and sys.stdin.isatty():
+                response = input("\n実行しますか？ (y/n): ")
+                if response.lower() != "y":
+                    logger.info("キャンセルされました")
+                    return 0
+
+            # 画像生成を実行
+            self.run_generation(target_axis, base_count)
+
+            # 完了後の進捗を表示
+            print("\n")
+            self.show_progress()
+
+            return 0
+
+        except KeyboardInterrupt:
+            logger.warning("\n中断されました")
+            return 1
+        except Exception as e:
+            logger.error("予期しないエラーが発生しました: %s", e, exc_info=True)
+            return 1
+        finally:
+            self.close()
+
+    def close(self):
+        """保留中のメタデータ書き込みを待ってからリソースを解放"""
+        self._io_executor.shutdown(wait=True)
+        self.client.close()
+
+
+# ====== コマンドライン引数の処理 ======
+
+
+def parse_arguments():
+    """コマンドライン引数をパース"""
+    parser = argparse.ArgumentParser(
+        description="ComfyUI画像生成ツール - 複数のプロンプトパラメータを探索"
+    )
+
+    parser.add_argument(
+        "-c",
+        "--config",
+        type=Path,
+        default=Path("config/explorer.yaml"),
+        help="設定ファイルのパス (デフォルト: config.yaml)",
+    )
+
+    parser.add_argument(
+        "-p", "--progress", action="store_true", help="進捗のみ表示して終了"
+    )
+
+    parser.add_argument(
+        "-y", "--yes", action="store_true", help="実行確認をスキップして実行"
+    )
+
+    parser.add_argument("-v", "--verbose", action="store_true", help="詳細なログを表示")
+
+    parser.add_argument("--log-file", type=Path, help="ログをファイルに出力")
+
+    return parser.parse_args()
+
+
+# ====== エントリーポイント ======
+
+
+def main():
+    """メインエントリーポイント"""
+    # コマンドライン引数をパース
+    args = parse_arguments()
+
+    # ロギング設定（ルートロガーを設定）
+    log_level = logging.DEBUG if args.verbose else logging.INFO
+    setup_logging(level=log_level, log_file=args.log_file)
+
+    # 設定ファイルの存在確認
+    if not args.config.exists():
+        logger.error("設定ファイルが見つかりません: %s", args.config)
+        return 1
+
+    try:
+        # Runnerを作成
+        runner = ImageGenerationRunner(args.config, auto_confirm=args.yes)
+
+        # 進捗のみ表示モード
+        if args.progress:
+            runner.show_progress()
+            return 0
+
+        # メイン実行
+        return runner.run()
+
+    except FileNotFoundError as e:
+        logger.error("ファイルが見つかりません: %s", e)
+        return 1
+    except ValueError as e:
+        logger.error("設定エラー: %s", e)
+        return 1
+    except Exception as e:
+        logger.error("予期しないエラー: %s", e, exc_info=True)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,355 +1,730 @@
-"""
-ComfyUI APIとの通信を担当するクライアント
-"""
-
-import logging
-import mimetypes
-import time
-from dataclasses import dataclass
-from pathlib import Path
-from typing import Any, Dict, Optional, Union
-
-import requests
-
-logger = logging.getLogger(__name__)
-
-
-@dataclass
-class ComfyUIResponse:
-    """ComfyUI APIレスポンスの統一型"""
-
-    success: bool
-    data: Optional[Dict[str, Any]] = None
-    error_message: str = ""
-    status_code: Optional[int] = None
-
-
-class ComfyUIClient:
-    """ComfyUI APIクライアント"""
-
-    def __init__(self, base_url: str = "http://127.0.0.1:8188", timeout: int = 30):
-        """
-        Args:
-            base_url: ComfyUIのベースURL
-            timeout: リクエストタイムアウト（秒）
-        """
-        self.base_url = base_url.rstrip("/")
-        self.timeout = timeout
-        self.session = requests.Session()  # セッションを再利用して効率化
-
-    def _make_url(self, endpoint: str) -> str:
-        """エンドポイントURLを生成"""
-        return f"{self.base_url}/{endpoint.lstrip('/')}"
-
-    def _handle_request(self, method: str, endpoint: str, **kwargs) -> ComfyUIResponse:
-        """
-        HTTPリクエストを実行し、統一的なエラーハンドリングを行う
-
-        Args:
-            method: HTTPメソッド (GET, POST等)
-            endpoint: APIエンドポイント
-            **kwargs: requests.requestに渡す追加引数
-        """
-        logger.debug(f"handle_request start: {kwargs}")
-        url = self._make_url(endpoint)
-
-        try:
-            response = self.session.request(
-                method=method, url=url, timeout=self.timeout, **kwargs
-            )
-            response.raise_for_status()
-
-            return ComfyUIResponse(
-                success=True, data=response.json(), status_code=response.status_code
-            )
-
-        except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP error: {e}")
-            return ComfyUIResponse(
-                success=False,
-                error_message=f"HTTP error: {e}",
-                status_code=e.response.status_code if e.response else None,
-            )
-
-        except requests.exceptions.ConnectionError as e:
-            logger.error(f"Connection error: {e}")
-            return ComfyUIResponse(
-                success=False,
-                error_message=f"Connection error: {e}. ComfyUIが起動していますか？",
-            )
-
-        except requests.exceptions.Timeout as e:
-            logger.error(f"Timeout: {e}")
-            return ComfyUIResponse(
-                success=False, error_message=f"Request timeout after {self.timeout}s"
-            )
-
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            return ComfyUIResponse(
-                success=False, error_message=f"Unexpected error: {e}"
-            )
-
-    # ====== 基本API ======
-
-    def queue_prompt(self, workflow: Dict[str, Any]) -> ComfyUIResponse:
-        """
-        ワークフローをキューに投入
-
-        Args:
-            workflow: ワークフローの辞書（JSONワークフロー）
-
-        Returns:
-            ComfyUIResponse: prompt_idを含むレスポンス
-        """
-        logger.info("Queueing prompt to ComfyUI")
-        return self._handle_request(
-            method="POST", endpoint="/prompt", json={"prompt": workflow}
-        )
-
-    def get_history(self, prompt_id: str) -> ComfyUIResponse:
-        """
-        特定のプロンプトの実行履歴を取得
-
-        Args:
-            prompt_id: プロンプトID
-
-        Returns:
-            ComfyUIResponse: 実行履歴データ
-        """
-        return self._handle_request(method="GET", endpoint=f"/history/{prompt_id}")
-
-    def get_queue(self) -> ComfyUIResponse:
-        """
-        現在のキュー状態を取得
-
-        Returns:
-            ComfyUIResponse: キュー情報
-        """
-        return self._handle_request(method="GET", endpoint="/queue")
-
-    def interrupt(self) -> ComfyUIResponse:
-        """
-        現在の実行を中断
-
-        Returns:
-            ComfyUIResponse: 中断結果
-        """
-        logger.warning("Interrupting current execution")
-        return self._handle_request(method="POST", endpoint="/interrupt")
-
-    # ====== 高レベルAPI ======
-
-    def wait_for_completion(
-        self,
-        prompt_id: str,
-        poll_interval: float = 1.0,
-        max_wait_time: Optional[float] = None,
-    ) -> ComfyUIResponse:
-        """
-        プロンプトの実行完了を待つ
-
-        Args:
-            prompt_id: 待機対象のプロンプトID
-            poll_interval: ポーリング間隔（秒）
-            max_wait_time: 最大待機時間（秒）、Noneの場合は無制限
-
-        Returns:
-            ComfyUIResponse: 完了時の履歴データ、またはエラー
-        """
-        logger.info(f"Waiting for prompt {prompt_id} to complete")
-        start_time = time.time()
-
-        while True:
-            # タイムアウトチェック
-            if max_wait_time and (time.time() - start_time) > max_wait_time:
-                logger.error(f"Timeout waiting for prompt {prompt_id}")
-                return ComfyUIResponse(
-                    success=False, error_message=f"Timeout after {max_wait_time}s"
-                )
-
-            # 履歴を取得
-            response = self.get_history(prompt_id)
-
-            if not response.success:
-                return response
-
-            # 完了チェック
-            history = response.data
-            if prompt_id in history and "outputs" in history[prompt_id]:
-                logger.info(f"Prompt {prompt_id} completed")
-                return response
-
-            # 待機
-            time.sleep(poll_interval)
-
-    def execute_and_wait(
-        self,
-        workflow: Dict[str, Any],
-        poll_interval: float = 1.0,
-        max_wait_time: Optional[float] = None,
-    ) -> ComfyUIResponse:
-        """
-        ワークフローを実行して完了まで待つ（便利メソッド）
-
-        Args:
-            workflow: ワークフロー辞書
-            poll_interval: ポーリング間隔（秒）
-            max_wait_time: 最大待機時間（秒）
-
-        Returns:
-            ComfyUIResponse: 完了時の履歴データ、またはエラー
-        """
-        logger.debug("execute_and_wait start")
-        # キューに投入
-        queue_response = self.queue_prompt(workflow)
-
-        if not queue_response.success:
-            return queue_response
-
-        # prompt_idを取得
-        prompt_id = queue_response.data.get("prompt_id")
-        if not prompt_id:
-            return ComfyUIResponse(
-                success=False,
-                error_message="Failed to get prompt_id from queue response",
-            )
-
-        # 完了を待つ
-        return self.wait_for_completion(
-            prompt_id=prompt_id,
-            poll_interval=poll_interval,
-            max_wait_time=max_wait_time,
-        )
-
-    # ====== ヘルスチェック ======
-
-    def is_alive(self) -> bool:
-        """
-        ComfyUIが起動しているかチェック
-
-        Returns:
-            bool: 起動していればTrue
-        """
-        try:
-            response = self.session.get(self._make_url("/system_stats"), timeout=5)
-            return response.status_code == 200
-        except Exception:
-            return False
-
-    def get_system_stats(self) -> ComfyUIResponse:
-        """
-        システム統計情報を取得
-
-        Returns:
-            ComfyUIResponse: システム統計データ
-        """
-        return self._handle_request(method="GET", endpoint="/system_stats")
-
-    # ====== リソース管理 ======
-
-    def close(self):
-        """セッションをクローズ"""
-        self.session.close()
-
-    def __enter__(self):
-        """コンテキストマネージャー対応"""
-        return self
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """コンテキストマネージャー対応"""
-        self.close()
-
-    def upload_image(
-        self,
-        image_path: Union[str, Path],
-        *,
-        name: Optional[str] = None,
-        image_type: str = "input",
-        subfolder: str = "",
-        overwrite: bool = False,
-    ) -> ComfyUIResponse:
-        """
-        ComfyUIの input/temp/output ディレクトリへ画像をアップロードする。
-
-        ComfyUI API: POST /upload/image
-          - form-data:
-              image: (file)
-              type: "input" | "temp" | "output"
-              subfolder: "" (optional)
-              overwrite: "true"/"1" なら上書き、それ以外はリネームして衝突回避
-        返却: {"name": filename, "subfolder": subfolder, "type": image_type}
-        """
-        path = Path(image_path)
-        if not path.exists():
-            return ComfyUIResponse(
-                success=False, error_message=f"Image not found: {path}"
-            )
-
-        upload_name = name or path.name
-
-        mime, _ = mimetypes.guess_type(upload_name)
-        if mime is None:
-            mime = "application/octet-stream"
-
-        data = {
-            "type": image_type,
-            "overwrite": "true" if overwrite else "false",
-            "subfolder": subfolder or "",
-        }
-
-        with path.open("rb") as f:
-            files = {"image": (upload_name, f, mime)}
-            return self._handle_request(
-                method="POST",
-                endpoint="/upload/image",
-                data=data,
-                files=files,
-            )
-
-
-# ====== 使用例 ======
-
-
-def example_usage():
-    """使用例"""
-
-    # 基本的な使い方
-    client = ComfyUIClient(base_url="http://127.0.0.1:8188")
-
-    # ヘルスチェック
-    if not client.is_alive():
-        print("ComfyUIが起動していません")
-        return
-
-    # ワークフローを読み込み（実際にはファイルから読む）
-    workflow = {"1": {"inputs": {}, "class_type": "CheckpointLoaderSimple"}}
-
-    # キューに投入
-    response = client.queue_prompt(workflow)
-    if response.success:
-        prompt_id = response.data["prompt_id"]
-        print(f"Queued: {prompt_id}")
-
-        # 完了を待つ
-        result = client.wait_for_completion(prompt_id)
-        if result.success:
-            print("完了しました")
-        else:
-            print(f"エラー: {result.error_message}")
-
-    # コンテキストマネージャーを使った例
-    with ComfyUIClient() as client:
-        result = client.execute_and_wait(workflow)
-        if result.success:
-            print("生成完了")
-
-
-if __name__ == "__main__":
-    # ロギング設定
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    )
-
-    example_usage()
+"""
+ComfyUI APIとの通信を担当するクライアント
+"""
+
+import json
+import logging
+import mimetypes
+import random
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from comfytools.utils import loads_json
+
+try:
+    import websocket  # websocket-client
+except ImportError:  # pragma: no cover
+    # 未インストール環境では /history ポーリングにフォールバックする
+    websocket = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+def _is_completed(history: Dict[str, Any], prompt_id: str) -> bool:
+    """
+    /history/{prompt_id} のレスポンスから完了済みかを判定
+
+    対象プロンプトのエントリだけを見て、outputs の中身はたどらない。
+    """
+    entry = history.get(prompt_id)
+    return entry is not None and "outputs" in entry
+
+
+@dataclass
+class ComfyUIResponse:
+    """ComfyUI APIレスポンスの統一型"""
+
+    success: bool
+    data: Optional[Dict[str, Any]] = None
+    error_message: str = ""
+    status_code: Optional[int] = None
+
+
+class ComfyUIClient:
+    """ComfyUI APIクライアント"""
+
+    def __init__(
+        self,
+        base_url: str = "http://127.0.0.1:8188",
+        timeout: int = 30,
+        use_websocket: bool = True,
+        ws_recv_timeout: float = 30.0,
+        max_poll_interval: float = 16.0,
+        pipeline_depth: int = 4,
+    ):
+        """
+        Args:
+            base_url: ComfyUIのベースURL
+            timeout: リクエストタイムアウト（秒）
+            use_websocket: 完了待ちに /ws の通知を使うか
+                （websocket-client 未インストール時は自動でポーリング）
+            ws_recv_timeout: WebSocket受信のタイムアウト（秒）。
+                この間通知が無ければ履歴を確認してから再接続する
+            max_poll_interval: ポーリング時のバックオフ上限（秒）
+            pipeline_depth: 先行投入する件数（コネクションプールの大きさに使う）
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_poll_interval = max_poll_interval
+        self.session = requests.Session()  # セッションを再利用して効率化
+        self._mount_adapter(pipeline_depth)
+
+        # WebSocket通知（/ws?clientId=...）
+        self.client_id = str(uuid.uuid4())
+        self.use_websocket = use_websocket and websocket is not None
+        self.ws_recv_timeout = ws_recv_timeout
+        self._ws = None  # 遅延接続
+        # 投入済みでまだ完了を返していない prompt_id（これ以外の通知は記録しない）
+        self._pending: Set[str] = set()
+        # WebSocketで受信済みの完了通知 {prompt_id: エラーメッセージ or None}
+        self._finished: Dict[str, Optional[str]] = {}
+        # WebSocketで受信したノード出力 {prompt_id: {node_id: output}}
+        self._outputs: Dict[str, Dict[str, Any]] = {}
+
+    def _mount_adapter(self, pipeline_depth: int) -> None:
+        """
+        コネクションプールとリトライを設定したHTTPAdapterをセッションに登録する
+
+        リトライは冪等なGET（/history, /system_stats 等）に限定し、
+        /prompt のPOSTが二重投入されないようにする。
+        """
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=["GET"],
+            raise_on_status=False,  # 最終的なステータスは raise_for_status で扱う
+        )
+        adapter = HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=max(pipeline_depth, 16),
+            max_retries=retry,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # requestsの既定値だが、上書きされないよう明示しておく
+        self.session.headers["Connection"] = "keep-alive"
+
+    def _make_url(self, endpoint: str) -> str:
+        """エンドポイントURLを生成"""
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
+
+    def _make_ws_url(self) -> str:
+        """WebSocketのURLを生成"""
+        if self.base_url.startswith("https://"):
+            ws_base = "wss://" + self.base_url[len("https://") :]
+        elif self.base_url.startswith("http://"):
+            ws_base = "ws://" + self.base_url[len("http://") :]
+        else:
+            ws_base = f"ws://{self.base_url}"
+        return f"{ws_base}/ws?clientId={self.client_id}"
+
+    def _handle_request(self, method: str, endpoint: str, **kwargs) -> ComfyUIResponse:
+        """
+        HTTPリクエストを実行し、統一的なエラーハンドリングを行う
+
+        Args:
+            method: HTTPメソッド (GET, POST等)
+            endpoint: APIエンドポイント
+            **kwargs: requests.requestに渡す追加引数
+        """
+        logger.debug("handle_request start: %s", kwargs)
+        url = self._make_url(endpoint)
+
+        try:
+            response = self.session.request(
+                method=method, url=url, timeout=self.timeout, **kwargs
+            )
+            response.raise_for_status()
+
+            return ComfyUIResponse(
+                success=True,
+                data=loads_json(response.content),
+                status_code=response.status_code,
+            )
+
+        except requests.exceptions.HTTPError as e:
+            logger.error("HTTP error: %s", e)
+            return ComfyUIResponse(
+                success=False,
+                error_message=f"HTTP error: {e}",
+                # エラー応答の Response は偽と評価されるため None と比較する
+                status_code=e.response.status_code if e.response is not None else None,
+            )
+
+        except requests.exceptions.ConnectionError as e:
+            logger.error("Connection error: %s", e)
+            return ComfyUIResponse(
+                success=False,
+                error_message=f"Connection error: {e}. ComfyUIが起動していますか？",
+            )
+
+        except requests.exceptions.Timeout as e:
+            logger.error("Timeout: %s", e)
+            return ComfyUIResponse(
+                success=False, error_message=f"Request timeout after {self.timeout}s"
+            )
+
+        except requests.RequestException as e:
+            logger.error("Request error: %s", e)
+            return ComfyUIResponse(success=False, error_message=f"Request error: {e}")
+
+        except ValueError as e:
+            # JSONとして解析できないレスポンス
+            # （orjson/json のエラーはどちらも ValueError）
+            logger.error("Invalid JSON response: %s", e)
+            return ComfyUIResponse(
+                success=False, error_message=f"Invalid JSON response: {e}"
+            )
+
+    # ====== WebSocket ======
+
+    def _connect_ws(self) -> bool:
+        """
+        WebSocketに接続する（接続済みなら何もしない）
+
+        接続に失敗したら以降は WebSocket を使わず、ポーリングで待機する
+        （/ws の無いサーバに対してジョブ毎に接続を試み直さないため）。
+
+        Returns:
+            bool: 接続できていればTrue
+        """
+        if not self.use_websocket:
+            return False
+        if self._ws is not None and self._ws.connected:
+            return True
+
+        self._close_ws()
+        try:
+            self._ws = websocket.create_connection(
+                self._make_ws_url(), timeout=self.timeout
+            )
+            logger.debug("WebSocketに接続しました: client_id=%s", self.client_id)
+            return True
+        except (websocket.WebSocketException, OSError) as e:
+            logger.warning(
+                "WebSocketに接続できません。以降はポーリングで待機します: %s", e
+            )
+            self._ws = None
+            self.use_websocket = False
+            return False
+
+    def _close_ws(self):
+        """WebSocketを切断"""
+        if self._ws is not None:
+            try:
+                self._ws.close()
+            except (websocket.WebSocketException, OSError):
+                pass
+            self._ws = None
+
+    def _handle_ws_message(self, message: Dict[str, Any]):
+        """
+        WebSocketメッセージから完了通知とノード出力を記録
+
+        Args:
+            message: 受信したメッセージ（JSON）
+        """
+        msg_type = message.get("type")
+        data = message.get("data") or {}
+        prompt_id = data.get("prompt_id")
+        # 完了を返し終えた prompt への遅れて届いた通知（execution_success の後の
+        # executing{node: None} など）は記録しない
+        if prompt_id not in self._pending:
+            return
+
+        if msg_type == "executed":
+            if data.get("output") is not None:
+                outputs = self._outputs.setdefault(prompt_id, {})
+                outputs[str(data.get("node"))] = data["output"]
+        elif msg_type == "executing" and data.get("node") is None:
+            self._finished.setdefault(prompt_id, None)
+        elif msg_type == "execution_success":
+            self._finished.setdefault(prompt_id, None)
+        elif msg_type == "execution_error":
+            self._finished[prompt_id] = (
+                f"Execution error: {data.get('exception_message', '')}"
+            )
+        elif msg_type == "execution_interrupted":
+            self._finished[prompt_id] = "Execution interrupted"
+
+    def _wait_via_websocket(
+        self, prompt_id: str, max_wait_time: Optional[float], fetch_history: bool
+    ) -> Optional[ComfyUIResponse]:
+        """
+        WebSocketの完了通知を待ち、完了後に履歴を1回だけ取得する
+
+        Args:
+            prompt_id: 待機対象のプロンプトID
+            max_wait_time: 最大待機時間（秒）、Noneの場合は無制限
+            fetch_history: Falseなら完了後の履歴取得を省略する
+
+        Returns:
+            ComfyUIResponse or None: WebSocketが使えない場合はNone
+        """
+        start_time = time.time()
+
+        while prompt_id not in self._finished:
+            recv_timeout = self.ws_recv_timeout
+            if max_wait_time:
+                remaining = max_wait_time - (time.time() - start_time)
+                if remaining <= 0:
+                    logger.error("Timeout waiting for prompt %s", prompt_id)
+                    return ComfyUIResponse(
+                        success=False, error_message=f"Timeout after {max_wait_time}s"
+                    )
+                recv_timeout = min(recv_timeout, remaining)
+
+            if not self._connect_ws():
+                return None
+
+            try:
+                self._ws.settimeout(recv_timeout)
+                raw = self._ws.recv()
+            except websocket.WebSocketTimeoutException:
+                # 通知を取りこぼした場合に備えて履歴を確認する。
+                # 単に実行が長いだけなので接続はそのまま使い続ける
+                # （張り直すと先行投入中の他の prompt の通知を取りこぼす）
+                logger.debug("WebSocket受信がタイムアウトしました: %s", prompt_id)
+                response = self.get_history(prompt_id)
+                if not response.success:
+                    return response
+                if _is_completed(response.data, prompt_id):
+                    self._outputs.pop(prompt_id, None)
+                    logger.info("Prompt %s completed", prompt_id)
+                    return response
+                continue
+            except (websocket.WebSocketException, OSError) as e:
+                logger.warning("WebSocketが切断されました。再接続します: %s", e)
+                self._close_ws()
+                continue
+
+            # バイナリメッセージ（プレビュー画像）は無視
+            if not isinstance(raw, str):
+                continue
+            try:
+                self._handle_ws_message(loads_json(raw))
+            except json.JSONDecodeError:
+                continue
+
+        error_message = self._finished.pop(prompt_id)
+        outputs = self._outputs.pop(prompt_id, {})
+        if error_message:
+            logger.error("Prompt %s failed: %s", prompt_id, error_message)
+            return ComfyUIResponse(success=False, error_message=error_message)
+
+        logger.info("Prompt %s completed", prompt_id)
+        if not fetch_history:
+            # 受信済みのノード出力を /history と同じ形で返す
+            return ComfyUIResponse(success=True, data={prompt_id: {"outputs": outputs}})
+        return self.get_history(prompt_id)
+
+    # ====== 基本API ======
+
+    def queue_prompt(self, workflow: Dict[str, Any]) -> ComfyUIResponse:
+        """
+        ワークフローをキューに投入
+
+        Args:
+            workflow: ワークフローの辞書（JSONワークフロー）
+
+        Returns:
+            ComfyUIResponse: prompt_idを含むレスポンス
+        """
+        logger.info("Queueing prompt to ComfyUI")
+        # 完了通知を取りこぼさないよう、投入前にWebSocketを接続しておく
+        self._connect_ws()
+        response = self._handle_request(
+            method="POST",
+            endpoint="/prompt",
+            json={"prompt": workflow, "client_id": self.client_id},
+        )
+        if response.success and response.data.get("prompt_id"):
+            self._pending.add(response.data["prompt_id"])
+        return response
+
+    def get_history(self, prompt_id: str) -> ComfyUIResponse:
+        """
+        特定のプロンプトの実行履歴を取得
+
+        Args:
+            prompt_id: プロンプトID
+
+        Returns:
+            ComfyUIResponse: 実行履歴データ
+        """
+        return self._handle_request(method="GET", endpoint=f"/history/{prompt_id}")
+
+    def get_queue(self) -> ComfyUIResponse:
+        """
+        現在のキュー状態を取得
+
+        Returns:
+            ComfyUIResponse: キュー情報
+        """
+        return self._handle_request(method="GET", endpoint="/queue")
+
+    def interrupt(self) -> ComfyUIResponse:
+        """
+        現在の実行を中断
+
+        Returns:
+            ComfyUIResponse: 中断結果
+        """
+        logger.warning("Interrupting current execution")
+        return self._handle_request(method="POST", endpoint="/interrupt")
+
+    # ====== 高レベルAPI ======
+
+    def wait_for_completion(
+        self,
+        prompt_id: str,
+        poll_interval: float = 1.0,
+        max_wait_time: Optional[float] = None,
+        fetch_history: bool = True,
+    ) -> ComfyUIResponse:
+        """
+        プロンプトの実行完了を待つ
+
+        WebSocketが使える場合は完了通知を待ってから履歴を1回だけ取得する。
+        使えない場合は /history/{prompt_id} をポーリングする。
+        ポーリング間隔は full jitter 付きの指数バックオフ
+        （0 〜 min(max_poll_interval, poll_interval * 2**attempt) の一様乱数）。
+
+        Args:
+            prompt_id: 待機対象のプロンプトID
+            poll_interval: ポーリング間隔の基準値（秒）
+            max_wait_time: 最大待機時間（秒）、Noneの場合は無制限
+            fetch_history: Falseの場合、WebSocketで完了を検知したら履歴を取得せず、
+                通知で受け取ったノード出力だけを {prompt_id: {"outputs": ...}} の
+                形で返す（出力ファイル名だけ分かればよい呼び出し元向け）
+
+        Returns:
+            ComfyUIResponse: 完了時の履歴データ、またはエラー
+        """
+        logger.info("Waiting for prompt %s to complete", prompt_id)
+        try:
+            return self._wait_for_completion(
+                prompt_id, poll_interval, max_wait_time, fetch_history
+            )
+        finally:
+            # 結果を返した prompt の受信状態は残さない（後から届く通知も無視される）
+            self._pending.discard(prompt_id)
+            self._finished.pop(prompt_id, None)
+            self._outputs.pop(prompt_id, None)
+
+    def _wait_for_completion(
+        self,
+        prompt_id: str,
+        poll_interval: float,
+        max_wait_time: Optional[float],
+        fetch_history: bool,
+    ) -> ComfyUIResponse:
+        """wait_for_completion の本体（WebSocket → ポーリングの順に待つ）"""
+        if self.use_websocket:
+            response = self._wait_via_websocket(
+                prompt_id, max_wait_time, fetch_history
+            )
+            if response is not None:
+                return response
+
+        start_time = time.time()
+        attempt = 0
+        last_state = None
+
+        while True:
+            # タイムアウトチェック
+            elapsed = time.time() - start_time
+            if max_wait_time and elapsed > max_wait_time:
+                logger.error("Timeout waiting for prompt %s", prompt_id)
+                return ComfyUIResponse(
+                    success=False, error_message=f"Timeout after {max_wait_time}s"
+                )
+
+            # 履歴を取得
+            response = self.get_history(prompt_id)
+
+            if not response.success:
+                return response
+
+            # 完了チェック
+            history = response.data
+            if _is_completed(history, prompt_id):
+                logger.info("Prompt %s completed", prompt_id)
+                return response
+
+            # 途中状態が変化したら完了間近とみなして間隔を詰め直す
+            state = history.get(prompt_id)
+            if state is not None and state != last_state:
+                attempt = 0
+            last_state = state
+
+            # 待機（full jitter 付き指数バックオフ）
+            sleep_s = random.uniform(
+                0, min(self.max_poll_interval, poll_interval * (2**attempt))
+            )
+            if max_wait_time:
+                sleep_s = min(sleep_s, max(0.0, max_wait_time - elapsed))
+            time.sleep(sleep_s)
+            attempt = min(attempt + 1, 6)
+
+    def execute_and_wait(
+        self,
+        workflow: Dict[str, Any],
+        poll_interval: float = 1.0,
+        max_wait_time: Optional[float] = None,
+        fetch_history: bool = True,
+    ) -> ComfyUIResponse:
+        """
+        ワークフローを実行して完了まで待つ（便利メソッド）
+
+        Args:
+            workflow: ワークフロー辞書
+            poll_interval: ポーリング間隔（秒）
+            max_wait_time: 最大待機時間（秒）
+            fetch_history: Falseなら完了後の履歴取得を省略する
+
+        Returns:
+            ComfyUIResponse: 完了時の履歴データ、またはエラー
+        """
+        logger.debug("execute_and_wait start")
+        # キューに投入
+        queue_response = self._submit(workflow)
+
+        if not queue_response.success:
+            return queue_response
+
+        # 完了を待つ
+        return self.wait_for_completion(
+            prompt_id=queue_response.data["prompt_id"],
+            poll_interval=poll_interval,
+            max_wait_time=max_wait_time,
+            fetch_history=fetch_history,
+        )
+
+    def execute_pipelined(
+        self,
+        jobs: Iterable[Tuple[Hashable, Dict[str, Any]]],
+        pipeline_depth: int = 4,
+        poll_interval: float = 1.0,
+        max_wait_time: Optional[float] = None,
+        fetch_history: bool = True,
+    ) -> Iterator[Tuple[Hashable, ComfyUIResponse]]:
+        """
+        複数のワークフローを先行投入しながら順に完了を待つ
+
+        常に最大 pipeline_depth 件をComfyUIのキューに積んでおき、
+        1件完了するごとに次を投入する。GPUの実行はComfyUI側で直列化されるため、
+        ジョブ間の投入・待機のすき間でGPUが遊ばなくなる。
+
+        Args:
+            jobs: (キー, ワークフロー) のイテラブル（遅延評価される）
+            pipeline_depth: 同時にキューへ積んでおく最大件数
+            poll_interval: ポーリング間隔（秒）
+            max_wait_time: 1件あたりの最大待機時間（秒）
+            fetch_history: Falseなら完了後の履歴取得を省略する
+
+        Yields:
+            Tuple[Hashable, ComfyUIResponse]:
+                投入順の (キー, 完了時の履歴データ or エラー)
+        """
+        pending = deque()
+        job_iter = iter(jobs)
+        exhausted = False
+
+        while True:
+            # キューを補充
+            while not exhausted and len(pending) < pipeline_depth:
+                try:
+                    key, workflow = next(job_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.append((key, self._submit(workflow)))
+
+            if not pending:
+                return
+
+            # 先頭から順に完了を待つ
+            key, queue_response = pending.popleft()
+            if not queue_response.success:
+                yield key, queue_response
+                continue
+
+            yield key, self.wait_for_completion(
+                prompt_id=queue_response.data["prompt_id"],
+                poll_interval=poll_interval,
+                max_wait_time=max_wait_time,
+                fetch_history=fetch_history,
+            )
+
+    def _submit(self, workflow: Dict[str, Any]) -> ComfyUIResponse:
+        """
+        ワークフローをキューに投入し、prompt_idの存在を確認する
+
+        Returns:
+            ComfyUIResponse: data["prompt_id"] を含むレスポンス、またはエラー
+        """
+        queue_response = self.queue_prompt(workflow)
+
+        if not queue_response.success:
+            return queue_response
+
+        # prompt_idを取得
+        if not queue_response.data.get("prompt_id"):
+            return ComfyUIResponse(
+                success=False,
+                error_message="Failed to get prompt_id from queue response",
+            )
+        return queue_response
+
+    # ====== ヘルスチェック ======
+
+    def is_alive(self) -> bool:
+        """
+        ComfyUIが起動しているかチェック
+
+        Returns:
+            bool: 起動していればTrue
+        """
+        try:
+            response = self.session.get(self._make_url("/system_stats"), timeout=5)
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    def get_system_stats(self) -> ComfyUIResponse:
+        """
+        システム統計情報を取得
+
+        Returns:
+            ComfyUIResponse: システム統計データ
+        """
+        return self._handle_request(method="GET", endpoint="/system_stats")
+
+    # ====== リソース管理 ======
+
+    def close(self):
+        """セッションとWebSocketをクローズ"""
+        self._close_ws()
+        self.session.close()
+
+    def __enter__(self):
+        """コンテキストマネージャー対応"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """コンテキストマネージャー対応"""
+        self.close()
+
+    def upload_image(
+        self,
+        image_path: Union[str, Path],
+        *,
+        name: Optional[str] = None,
+        image_type: str = "input",
+        subfolder: str = "",
+        overwrite: bool = False,
+    ) -> ComfyUIResponse:
+        """
+        ComfyUIの input/temp/output ディレクトリへ画像をアップロードする。
+
+        ComfyUI API: POST /upload/image
+          - form-data:
+              image: (file)
+              type: "input" | "temp" | "output"
+              subfolder: "" (optional)
+              overwrite: "true"/"1" なら上書き、それ以外はリネームして衝突回避
+        返却: {"name": filename, "subfolder": subfolder, "type": image_type}
+        """
+        path = Path(image_path)
+        if not path.exists():
+            return ComfyUIResponse(
+                success=False, error_message=f"Image not found: {path}"
+            )
+
+        upload_name = name or path.name
+
+        mime, _ = mimetypes.guess_type(upload_name)
+        if mime is None:
+            mime = "application/octet-stream"
+
+        data = {
+            "type": image_type,
+            "overwrite": "true" if overwrite else "false",
+            "subfolder": subfolder or "",
+        }
+
+        with path.open("rb") as f:
+            files = {"image": (upload_name, f, mime)}
+            return self._handle_request(
+                method="POST",
+                endpoint="/upload/image",
+                data=data,
+                files=files,
+            )
+
+
+# ====== 使用例 ======
+
+
+def example_usage():
+    """使用例"""
+
+    # 基本的な使い方
+    client = ComfyUIClient(base_url="http://127.0.0.1:8188")
+
+    # ヘルスチェック
+    if not client.is_alive():
+        print("ComfyUIが起動していません")
+        return
+
+    # ワークフローを読み込み（実際にはファイルから読む）
+    workflow = {"1": {"inputs": {}, "class_type": "CheckpointLoaderSimple"}}
+
+    # キューに投入
+    response = client.queue_prompt(workflow)
+    if response.success:
+        prompt_id = response.data["prompt_id"]
+        print(f"Queued: {prompt_id}")
+
+        # 完了を待つ
+        result = client.wait_for_completion(prompt_id)
+        if result.success:
+            print("完了しました")
+        else:
+            print(f"エラー: {result.error_message}")
+
+    # コンテキストマネージャーを使った例
+    with ComfyUIClient() as client:
+        result = client.execute_and_wait(workflow)
+        if result.success:
+            print("生成完了")
+
+
+if __name__ == "__main__":
+    # ロギング設定
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    example_usage()
@@ -1,204 +1,262 @@
-"""
-ComfyUI画像生成ツールのデータモデル定義
-"""
-
-from dataclasses import dataclass, field
-from pathlib import Path
-from typing import List, Union
-
-# ====== プロンプト関連 ======
-
-
-@dataclass
-class WeightedPrompt:
-    """重み付きプロンプト"""
-
-    text: str
-    weight: float = 1.0
-
-    def __str__(self) -> str:
-        return self.text
-
-
-@dataclass
-class PromptAxis:
-    """プロンプトの1つの軸（髪型、表情など）"""
-
-    name: str
-    choices: List[Union[str, WeightedPrompt]]
-
-    def get_all_values(self) -> List[str]:
-        """全選択肢の値を取得（重み情報は除く）"""
-        return [c.text if isinstance(c, WeightedPrompt) else c for c in self.choices]
-
-    def is_weighted(self) -> bool:
-        """重み付き軸かどうか"""
-        return len(self.choices) > 0 and isinstance(self.choices[0], WeightedPrompt)
-
-
-@dataclass
-class PromptTemplate:
-    """プロンプトテンプレート（固定部分+可変軸）"""
-
-    fixed_positive: List[str]
-    axes: List[PromptAxis]
-    negative: List[str]
-
-    def get_axis_by_name(self, name: str) -> PromptAxis:
-        """名前で軸を取得"""
-        for axis in self.axes:
-            if axis.name == name:
-                return axis
-        raise ValueError(f"軸 '{name}' が見つかりません")
-
-    def get_axis_names(self) -> List[str]:
-        """全軸の名前リストを取得"""
-        return [axis.name for axis in self.axes]
-
-
-# ====== サンプリングパラメータ ======
-
-
-@dataclass
-class SamplerConfig:
-    """KSamplerの設定"""
-
-    steps: int
-    cfg: float
-    sampler_name: str
-    scheduler: str
-    seed: int = 0
-
-    def __post_init__(self):
-        if self.steps <= 0:
-            raise ValueError("stepsは1以上である必要があります")
-        if self.cfg <= 0:
-            raise ValueError("cfgは正の値である必要があります")
-
-
-@dataclass
-class LoraConfig:
-    """LoRAの設定"""
-
-    name: str
-    model_strength: float
-    clip_strength: float
-
-    def __post_init__(self):
-        if not self.name.endswith(".safetensors"):
-            raise ValueError("LoRAファイル名は.safetensorsで終わる必要があります")
-
-
-# ====== 生成パラメータ（1回の生成に必要な全情報）======
-
-
-@dataclass
-class GenerationParams:
-    """1回の画像生成に必要な全パラメータ"""
-
-    # プロンプト
-    positive_prompt: str
-    negative_prompt: str
-
-    # サンプラー
-    sampler: SamplerConfig
-
-    # LoRA
-    lora: LoraConfig
-
-    # メタ情報
-    target_axis_name: str  # 今回探索している軸
-    prompt_values: dict = field(default_factory=dict)  # 各軸の選択値
-
-    def to_dict(self) -> dict:
-        """メタデータとして保存するための辞書形式"""
-        return {
-            "axis": self.target_axis_name,
-            "positive": self.positive_prompt,
-            "negative": self.negative_prompt,
-            "steps": self.sampler.steps,
-            "cfg": self.sampler.cfg,
-            "sampler": self.sampler.sampler_name,
-            "scheduler": self.sampler.scheduler,
-            "seed": self.sampler.seed,
-            "lora": self.lora.name,
-            "lora_model_strength": self.lora.model_strength,
-            "lora_clip_strength": self.lora.clip_strength,
-            "prompt_values": self.prompt_values,
-        }
-
-
-# ====== ワークフロー設定 ======
-
-
-@dataclass
-class NodeMapping:
-    """ComfyUIワークフローのノードID定義"""
-
-    positive_prompt: str
-    negative_prompt: str
-    ksampler: str
-    empty_latent: str
-    save_image: str
-    lora: str
-
-    @classmethod
-    def default(cls) -> "NodeMapping":
-        """デフォルトのノードマッピング"""
-        return cls(
-            positive_prompt="2",
-            negative_prompt="3",
-            ksampler="4",
-            empty_latent="5",
-            save_image="7",
-        )
-
-
-@dataclass
-class WorkflowConfig:
-    """ワークフロー全体の設定"""
-
-    json_path: Path
-    node_mapping: NodeMapping
-    output_root: Path
-
-    def __post_init__(self):
-        if not self.json_path.exists():
-            raise FileNotFoundError(
-                f"ワークフローファイルが見つかりません: {self.json_path}"
-            )
-
-
-# ====== 実行設定 ======
-
-
-@dataclass
-class ExecutionConfig:
-    """実行時の設定"""
-
-    repeats: int = 2  # 各パターンの繰り返し回数
-    randomize_non_target: bool = True  # 非探索軸をランダム化するか
-    comfy_url: str = "http://127.0.0.1:8188"
-    state_file: Path = Path("axis_state.json")
-    poll_interval: float = 1.0  # ポーリング間隔（秒）
-
-    def __post_init__(self):
-        if self.repeats <= 0:
-            raise ValueError("repeatsは1以上である必要があります")
-        if self.poll_interval <= 0:
-            raise ValueError("poll_intervalは正の値である必要があります")
-
-
-# ====== 実行結果 ======
-
-
-@dataclass
-class GenerationResult:
-    """生成結果の情報"""
-
-    run_id: str
-    prompt_id: str
-    params: GenerationParams
-    output_dir: Path
-    success: bool = True
-    error_message: str = ""
+"""
+ComfyUI画像生成ツールのデータモデル定義
+"""
+
+import random
+from dataclasses import dataclass, field
+from functools import cached_property
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+# ====== プロンプト関連 ======
+
+
+@dataclass
+class WeightedPrompt:
+    """重み付きプロンプト"""
+
+    text: str
+    weight: float = 1.0
+
+    def __str__(self) -> str:
+        return self.text
+
+
+@dataclass
+class PromptAxis:
+    """プロンプトの1つの軸（髪型、表情など）"""
+
+    name: str
+    choices: List[Union[str, WeightedPrompt]]
+
+    # 生成ループ内で毎回作り直さないよう、初期化時に一度だけ計算する
+    _values: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    _weighted: bool = field(init=False, repr=False, compare=False)
+    _cum_weights: Optional[List[float]] = field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        # 前後の空白はここで一度だけ除去する（プロンプト結合時に毎回 strip しない）
+        self._values = tuple(
+            (c.text if isinstance(c, WeightedPrompt) else c).strip()
+            for c in self.choices
+        )
+
+        # 重み付き軸のみ累積重みを持つ（文字列の選択肢は重み1.0扱い）
+        self._weighted = any(isinstance(c, WeightedPrompt) for c in self.choices)
+        self._cum_weights = None
+        if self._weighted:
+            weights = [
+                c.weight if isinstance(c, WeightedPrompt) else 1.0
+                for c in self.choices
+            ]
+            # weightsがすべて0の場合は等確率
+            if any(w > 0 for w in weights):
+                self._cum_weights = list(accumulate(weights))
+
+    def get_all_values(self) -> List[str]:
+        """全選択肢の値を取得（重み情報は除く）"""
+        return list(self._values)
+
+    def is_weighted(self) -> bool:
+        """重み付き軸かどうか"""
+        return self._weighted
+
+    def pick(self, rng: Optional[random.Random] = None) -> str:
+        """
+        選択肢から1つ選ぶ（重み付き/等確率を自動判定）
+
+        Args:
+            rng: 使用する乱数生成器（省略時はモジュール共通の乱数）
+
+        Returns:
+            str: 選択された値（選択肢が空の場合は空文字列）
+        """
+        if not self._values:
+            return ""
+        rng = rng or random
+        if self._cum_weights is None:
+            return rng.choice(self._values)
+        return rng.choices(self._values, cum_weights=self._cum_weights, k=1)[0]
+
+
+@dataclass
+class PromptTemplate:
+    """プロンプトテンプレート（固定部分+可変軸）"""
+
+    fixed_positive: List[str]
+    axes: List[PromptAxis]
+    negative: List[str]
+
+    def get_axis_by_name(self, name: str) -> PromptAxis:
+        """名前で軸を取得"""
+        for axis in self.axes:
+            if axis.name == name:
+                return axis
+        raise ValueError(f"軸 '{name}' が見つかりません")
+
+    def get_axis_names(self) -> List[str]:
+        """全軸の名前リストを取得"""
+        return [axis.name for axis in self.axes]
+
+    @cached_property
+    def axis_sizes(self) -> Dict[str, int]:
+        """軸名ごとの選択肢数（初回アクセス時に計算してキャッシュ）"""
+        return {axis.name: len(axis.choices) for axis in self.axes}
+
+
+# ====== サンプリングパラメータ ======
+
+
+@dataclass
+class SamplerConfig:
+    """KSamplerの設定"""
+
+    steps: int
+    cfg: float
+    sampler_name: str
+    scheduler: str
+    seed: int = 0
+
+    def __post_init__(self):
+        if self.steps <= 0:
+            raise ValueError("stepsは1以上である必要があります")
+        if self.cfg <= 0:
+            raise ValueError("cfgは正の値である必要があります")
+
+
+@dataclass
+class LoraConfig:
+    """LoRAの設定"""
+
+    name: str
+    model_strength: float
+    clip_strength: float
+
+    def __post_init__(self):
+        if not self.name.endswith(".safetensors"):
+            raise ValueError("LoRAファイル名は.safetensorsで終わる必要があります")
+
+
+# ====== 生成パラメータ（1回の生成に必要な全情報）======
+
+
+@dataclass
+class GenerationParams:
+    """1回の画像生成に必要な全パラメータ"""
+
+    # プロンプト
+    positive_prompt: str
+    negative_prompt: str
+
+    # サンプラー
+    sampler: SamplerConfig
+
+    # LoRA
+    lora: LoraConfig
+
+    # メタ情報
+    target_axis_name: str  # 今回探索している軸
+    prompt_values: dict = field(default_factory=dict)  # 各軸の選択値
+
+    def to_dict(self) -> dict:
+        """メタデータとして保存するための辞書形式"""
+        return {
+            "axis": self.target_axis_name,
+            "positive": self.positive_prompt,
+            "negative": self.negative_prompt,
+            "steps": self.sampler.steps,
+            "cfg": self.sampler.cfg,
+            "sampler": self.sampler.sampler_name,
+            "scheduler": self.sampler.scheduler,
+            "seed": self.sampler.seed,
+            "lora": self.lora.name,
+            "lora_model_strength": self.lora.model_strength,
+            "lora_clip_strength": self.lora.clip_strength,
+            "prompt_values": self.prompt_values,
+        }
+
+
+# ====== ワークフロー設定 ======
+
+
+@dataclass
+class NodeMapping:
+    """ComfyUIワークフローのノードID定義"""
+
+    positive_prompt: str
+    negative_prompt: str
+    ksampler: str
+    empty_latent: str
+    save_image: str
+    lora: str
+
+    @classmethod
+    def default(cls) -> "NodeMapping":
+        """デフォルトのノードマッピング"""
+        return cls(
+            positive_prompt="2",
+            negative_prompt="3",
+            ksampler="4",
+            empty_latent="5",
+            save_image="7",
+        )
+
+
+@dataclass
+class WorkflowConfig:
+    """ワークフロー全体の設定"""
+
+    json_path: Path
+    node_mapping: NodeMapping
+    output_root: Path
+
+    def __post_init__(self):
+        if not self.json_path.exists():
+            raise FileNotFoundError(
+                f"ワークフローファイルが見つかりません: {self.json_path}"
+            )
+
+
+# ====== 実行設定 ======
+
+
+@dataclass
+class ExecutionConfig:
+    """実行時の設定"""
+
+    repeats: int = 2  # 各パターンの繰り返し回数
+    randomize_non_target: bool = True  # 非探索軸をランダム化するか
+    comfy_url: str = "http://127.0.0.1:8188"
+    state_file: Path = Path("axis_state.json")
+    poll_interval: float = 1.0  # ポーリング間隔の基準値（秒）
+    max_poll_interval: float = 16.0  # ポーリングのバックオフ上限（秒）
+    pipeline_depth: int = 4  # ComfyUIのキューに先行投入しておく件数
+    random_seed: Optional[int] = None  # 軸の選択とKSamplerのseedに使う乱数シード
+
+    def __post_init__(self):
+        if self.repeats <= 0:
+            raise ValueError("repeatsは1以上である必要があります")
+        if self.poll_interval <= 0:
+            raise ValueError("poll_intervalは正の値である必要があります")
+        if self.max_poll_interval < self.poll_interval:
+            raise ValueError("max_poll_intervalはpoll_interval以上である必要があります")
+        if self.pipeline_depth <= 0:
+            raise ValueError("pipeline_depthは1以上である必要があります")
+
+
+# ====== 実行結果 ======
+
+
+@dataclass
+class GenerationResult:
+    """生成結果の情報"""
+
+    run_id: str
+    prompt_id: str
+    params: GenerationParams
+    output_dir: Path
+    success: bool = True
+    error_message: str = ""
@@ -1,555 +1,733 @@
-"""
-汎用ユーティリティ関数
-"""
-
-import logging
-import math
-import random
-import time
-import uuid
-from pathlib import Path
-from typing import List, Tuple, Union
-
-logger = logging.getLogger(__name__)
-
-
-# ====== ランダム選択 ======
-
-
-def weighted_choice(items: List[Tuple[str, float]]) -> str:
-    """
-    重み付きランダム選択
-
-    Args:
-        items: [(value, weight), ...] 形式のリスト
-
-    Returns:
-        str: 選択された値
-
-    Examples:
-        >>> items = [("a", 2.0), ("b", 1.0), ("c", 0.5)]
-        >>> result = weighted_choice(items)
-        >>> result in ["a", "b", "c"]
-        True
-    """
-    if not items:
-        return ""
-
-    values = [v for v, _ in items]
-    weights = [w for _, w in items]
-
-    # weightsがすべて0の場合は等確率
-    if all(w == 0 for w in weights):
-        return random.choice(values)
-
-    return random.choices(values, weights=weights, k=1)[0]
-
-
-def pick_from_choices(choices: List[Union[str, Tuple[str, float]]]) -> str:
-    """
-    選択肢から1つ選ぶ（重み付き/等確率を自動判定）
-
-    Args:
-        choices: 文字列リスト or (文字列, 重み) のタプルリスト
-
-    Returns:
-        str: 選択された値（常に文字列）
-
-    Examples:
-        >>> pick_from_choices(["a", "b", "c"])
-        'a'  # or 'b' or 'c'
-
-        >>> pick_from_choices([("a", 2.0), ("b", 1.0)])
-        'a'  # or 'b'
-    """
-    if not choices:
-        return ""
-
-    first = choices[0]
-
-    # 重み付きタプルの場合
-    if isinstance(first, tuple):
-        result = weighted_choice(choices)
-    else:
-        # 等確率の場合
-        result = random.choice(choices)
-
-    # 結果が文字列でない場合は空文字列を返す
-    if not isinstance(result, str):
-        return ""
-
-    return result
-
-
-# ====== ID生成 ======
-
-
-def generate_run_id(index: int = 0) -> str:
-    """
-    実行IDを生成（一意性保証）
-
-    Args:
-        index: 連番（オプション）
-
-    Returns:
-        str: 実行ID（例: "0001_a3f5b2"）
-
-    Examples:
-        >>> run_id = generate_run_id(1)
-        >>> len(run_id)
-        11
-        >>> run_id.startswith("0001_")
-        True
-    """
-    if index > 0:
-        return f"{index:04d}_{uuid.uuid4().hex[:6]}"
-    else:
-        return f"{uuid.uuid4().hex[:8]}"
-
-
-def generate_seed() -> int:
-    """
-    シード値を生成（現在時刻ベース）
-
-    Returns:
-        int: シード値（0 ~ 1,999,999,999）
-
-    Examples:
-        >>> seed = generate_seed()
-        >>> 0 <= seed < 2_000_000_000
-        True
-    """
-    return int(time.time() * 1000) % 2_000_000_000
-
-
-# ====== 組み合わせ計算 ======
-
-
-def calculate_combinations_count(target_axis_size: int, *other_sizes: int) -> int:
-    """
-    組み合わせの総数を計算
-
-    Args:
-        target_axis_size: 探索軸のサイズ
-        *other_sizes: その他の軸のサイズ
-
-    Returns:
-        int: 組み合わせの総数
-
-    Examples:
-        >>> calculate_combinations_count(5, 2, 3, 4)
-        120
-    """
-    sizes = [target_axis_size] + list(other_sizes)
-    return math.prod(sizes)
-
-
-def estimate_total_images(
-    axis_size: int, sampler_combinations: int, lora_combinations: int, repeats: int = 1
-) -> int:
-    """
-    生成される画像の総数を見積もる
-
-    Args:
-        axis_size: 探索軸のサイズ
-        sampler_combinations: サンプラーの組み合わせ数
-        lora_combinations: LoRAの組み合わせ数
-        repeats: 繰り返し回数
-
-    Returns:
-        int: 生成される画像の総数
-
-    Examples:
-        >>> estimate_total_images(10, 4, 2, repeats=2)
-        160
-    """
-    return axis_size * sampler_combinations * lora_combinations * repeats
-
-
-# ====== 時間・期間 ======
-
-
-def format_duration(seconds: float) -> str:
-    """
-    秒数を人間が読みやすい形式に変換
-
-    Args:
-        seconds: 秒数
-
-    Returns:
-        str: フォーマット済み文字列
-
-    Examples:
-        >>> format_duration(65)
-        '1分5秒'
-        >>> format_duration(3665)
-        '1時間1分5秒'
-        >>> format_duration(45)
-        '45秒'
-    """
-    if seconds < 60:
-        return f"{int(seconds)}秒"
-
-    minutes = int(seconds // 60)
-    secs = int(seconds % 60)
-
-    if minutes < 60:
-        return f"{minutes}分{secs}秒"
-
-    hours = minutes // 60
-    mins = minutes % 60
-    return f"{hours}時間{mins}分{secs}秒"
-
-
-def estimate_time_remaining(completed: int, total: int, elapsed_seconds: float) -> str:
-    """
-    残り時間を見積もる
-
-    Args:
-        completed: 完了した数
-        total: 全体の数
-        elapsed_seconds: 経過時間（秒）
-
-    Returns:
-        str: 残り時間の見積もり
-
-    Examples:
-        >>> estimate_time_remaining(25, 100, 60.0)
-        '3分0秒'
-    """
-    if completed == 0:
-        return "不明"
-
-    avg_time_per_item = elapsed_seconds / completed
-    remaining_items = total - completed
-    remaining_seconds = avg_time_per_item * remaining_items
-
-    return format_duration(remaining_seconds)
-
-
-# ====== ファイル・ディレクトリ ======
-
-
-def ensure_directory(path: Path) -> Path:
-    """
-    ディレクトリが存在することを保証（なければ作成）
-
-    Args:
-        path: ディレクトリパス
-
-    Returns:
-        Path: 作成されたディレクトリパス
-
-    Examples:
-        >>> p = ensure_directory(Path("test_dir"))
-        >>> p.exists()
-        True
-    """
-    path.mkdir(parents=True, exist_ok=True)
-    return path
-
-
-def safe_filename(text: str, max_length: int = 50) -> str:
-    """
-    安全なファイル名に変換（特殊文字を除去）
-
-    Args:
-        text: 元のテキスト
-        max_length: 最大文字数
-
-    Returns:
-        str: 安全なファイル名
-
-    Examples:
-        >>> safe_filename("hello/world:test")
-        'hello_world_test'
-        >>> safe_filename("a" * 100, max_length=10)
-        'aaaaaaaaaa'
-    """
-    # 特殊文字を置換
-    safe = text.replace("/", "_").replace("\\", "_")
-    safe = safe.replace(":", "_").replace("*", "_")
-    safe = safe.replace("?", "_").replace('"', "_")
-    safe = safe.replace("<", "_").replace(">", "_")
-    safe = safe.replace("|", "_")
-
-    # 連続するアンダースコアを1つに
-    while "__" in safe:
-        safe = safe.replace("__", "_")
-
-    # 前後の空白・アンダースコアを削除
-    safe = safe.strip("_ ")
-
-    # 長さ制限
-    if len(safe) > max_length:
-        safe = safe[:max_length]
-
-    return safe
-
-
-# ====== プロンプト操作 ======
-
-
-def join_prompts(prompts: List[str]) -> str:
-    """
-    プロンプトのリストをカンマ区切りで結合
-    空文字列は除外する
-
-    Args:
-        prompts: プロンプトのリスト
-
-    Returns:
-        str: 結合されたプロンプト
-
-    Examples:
-        >>> join_prompts(["1girl", "smile", "", "long hair"])
-        '1girl, smile, long hair'
-    """
-    # 空文字列を除外
-    filtered = [p.strip() for p in prompts if p.strip()]
-    return ", ".join(filtered)
-
-
-def clean_prompt(prompt: str) -> str:
-    """
-    プロンプトをクリーンアップ（余分な空白・カンマを除去）
-
-    Args:
-        prompt: 元のプロンプト
-
-    Returns:
-        str: クリーンアップされたプロンプト
-
-    Examples:
-        >>> clean_prompt("1girl,  , smile,  long hair")
-        '1girl, smile, long hair'
-    """
-    # カンマで分割
-    parts = [p.strip() for p in prompt.split(",")]
-    # 空文字列を除外
-    parts = [p for p in parts if p]
-    # 再結合
-    return ", ".join(parts)
-
-
-# ====== 進捗表示 ======
-
-
-def print_progress_bar(
-    current: int, total: int, prefix: str = "", suffix: str = "", bar_length: int = 50
-):
-    """
-    プログレスバーを表示
-
-    Args:
-        current: 現在の進捗
-        total: 全体の数
-        prefix: 前置きテキスト
-        suffix: 後置きテキスト
-        bar_length: バーの長さ
-
-    Examples:
-        >>> print_progress_bar(25, 100, prefix="Progress:", suffix="Complete")
-        Progress: |████████████▌                                       | 25/100 Complete
-    """
-    if total == 0:
-        return
-
-    filled_length = int(bar_length * current // total)
-    bar = "█" * filled_length + "▌" * (1 if current < total else 0)
-    bar = bar.ljust(bar_length)
-
-    print(f"\r{prefix} |{bar}| {current}/{total} {suffix}", end="", flush=True)
-
-    if current == total:
-        print()  # 改行
-
-
-# ====== データ検証 ======
-
-
-def validate_positive_int(value: int, name: str = "value"):
-    """
-    正の整数であることを検証
-
-    Args:
-        value: 検証する値
-        name: パラメータ名（エラーメッセージ用）
-
-    Raises:
-        ValueError: 正の整数でない場合
-    """
-    if not isinstance(value, int) or value <= 0:
-        raise ValueError(f"{name} は正の整数である必要があります: {value}")
-
-
-def validate_positive_float(value: float, name: str = "value"):
-    """
-    正の浮動小数点数であることを検証
-
-    Args:
-        value: 検証する値
-        name: パラメータ名（エラーメッセージ用）
-
-    Raises:
-        ValueError: 正の浮動小数点数でない場合
-    """
-    if not isinstance(value, (int, float)) or value <= 0:
-        raise ValueError(f"{name} は正の数である必要があります: {value}")
-
-
-def validate_range(value: float, min_val: float, max_val: float, name: str = "value"):
-    """
-    値が範囲内にあることを検証
-
-    Args:
-        value: 検証する値
-        min_val: 最小値
-        max_val: 最大値
-        name: パラメータ名（エラーメッセージ用）
-
-    Raises:
-        ValueError: 範囲外の場合
-    """
-    if not (min_val <= value <= max_val):
-        raise ValueError(
-            f"{name} は {min_val} から {max_val} の範囲である必要があります: {value}"
-        )
-
-
-# ====== ロギングヘルパー ======
-
-
-def setup_logging(
-    level: int = logging.INFO, log_file: Path = None, log_format: str = None
-):
-    """
-    ルートロガーをセットアップ（すべてのモジュールに適用）
-
-    Args:
-        level: ログレベル
-        log_file: ログファイルパス（Noneの場合はコンソールのみ）
-        log_format: ログフォーマット
-    """
-    # デフォルトのフォーマット
-    if log_format is None:
-        log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-
-    # ルートロガーを取得
-    root_logger = logging.getLogger()
-    root_logger.setLevel(level)
-
-    # 既存のハンドラーをクリア
-    root_logger.handlers.clear()
-
-    # フォーマッター
-    formatter = logging.Formatter(log_format, datefmt="%Y-%m-%d %H:%M:%S")
-
-    # コンソールハンドラー
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    console_handler.setLevel(level)
-    root_logger.addHandler(console_handler)
-
-    # ファイルハンドラー（オプション）
-    if log_file:
-        file_handler = logging.FileHandler(log_file, encoding="utf-8")
-        file_handler.setFormatter(formatter)
-        file_handler.setLevel(level)
-        root_logger.addHandler(file_handler)
-
-
-def setup_logger(
-    name: str = __name__, level: int = logging.INFO, log_file: Path = None
-) -> logging.Logger:
-    """
-    個別のロガーをセットアップ（後方互換性のため残す）
-
-    Note:
-        新しいコードでは setup_logging() を推奨
-        この関数は既存コードとの互換性のために残されています
-
-    Args:
-        name: ロガー名
-        level: ログレベル
-        log_file: ログファイルパス（Noneの場合はコンソールのみ）
-
-    Returns:
-        logging.Logger: 設定されたロガー
-    """
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
-
-    # ハンドラーをクリア
-    logger.handlers.clear()
-
-    # フォーマッター
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-
-    # コンソールハンドラー
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-
-    # ファイルハンドラー（オプション）
-    if log_file:
-        file_handler = logging.FileHandler(log_file, encoding="utf-8")
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-
-    return logger
-
-
-# ====== 使用例 ======
-
-
-def example_usage():
-    """使用例"""
-
-    print("=== ランダム選択 ===")
-    choices = [("a", 2.0), ("b", 1.0), ("c", 0.5)]
-    print(f"重み付き選択: {weighted_choice(choices)}")
-
-    print("\n=== ID生成 ===")
-    print(f"実行ID: {generate_run_id(1)}")
-    print(f"シード: {generate_seed()}")
-
-    print("\n=== 組み合わせ計算 ===")
-    count = calculate_combinations_count(10, 2, 3, 4)
-    print(f"組み合わせ数: {count}")
-
-    total_images = estimate_total_images(10, 4, 2, repeats=2)
-    print(f"総画像数: {total_images}")
-
-    print("\n=== 時間フォーマット ===")
-    print(f"65秒 = {format_duration(65)}")
-    print(f"3665秒 = {format_duration(3665)}")
-
-    print("\n=== 残り時間見積もり ===")
-    remaining = estimate_time_remaining(25, 100, 60.0)
-    print(f"残り時間: {remaining}")
-
-    print("\n=== ファイル名 ===")
-    safe = safe_filename("hello/world:test*?")
-    print(f"安全なファイル名: {safe}")
-
-    print("\n=== プロンプト操作 ===")
-    prompts = ["1girl", "", "smile", "  ", "long hair"]
-    joined = join_prompts(prompts)
-    print(f"結合: {joined}")
-
-    dirty = "1girl,  , smile,  long hair"
-    clean = clean_prompt(dirty)
-    print(f"クリーンアップ: {clean}")
-
-    print("\n=== プログレスバー ===")
-    for i in range(101):
-        print_progress_bar(i, 100, prefix="Progress:", suffix="Complete")
-        time.sleep(0.01)
-
-
-if __name__ == "__main__":
-    example_usage()
+"""
+汎用ユーティリティ関数
+"""
+
+import json
+import logging
+import math
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    # 未インストール環境では標準ライブラリの json を使う
+    orjson = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+# ====== ランダム選択 ======
+
+
+def weighted_choice(items: List[Tuple[str, float]]) -> str:
+    """
+    重み付きランダム選択
+
+    Args:
+        items: [(value, weight), ...] 形式のリスト
+
+    Returns:
+        str: 選択された値
+
+    Examples:
+        >>> items = [("a", 2.0), ("b", 1.0), ("c", 0.5)]
+        >>> result = weighted_choice(items)
+        >>> result in ["a", "b", "c"]
+        True
+    """
+    if not items:
+        return ""
+
+    values = [v for v, _ in items]
+    weights = [w for _, w in items]
+
+    # weightsがすべて0の場合は等確率
+    if all(w == 0 for w in weights):
+        return random.choice(values)
+
+    return random.choices(values, weights=weights, k=1)[0]
+
+
+def pick_from_choices(choices: List[Union[str, Tuple[str, float]]]) -> str:
+    """
+    選択肢から1つ選ぶ（重み付き/等確率を自動判定）
+
+    Args:
+        choices: 文字列リスト or (文字列, 重み) のタプルリスト
+
+    Returns:
+        str: 選択された値（常に文字列）
+
+    Examples:
+        >>> pick_from_choices(["a", "b", "c"])
+        'a'  # or 'b' or 'c'
+
+        >>> pick_from_choices([("a", 2.0), ("b", 1.0)])
+        'a'  # or 'b'
+    """
+    if not choices:
+        return ""
+
+    first = choices[0]
+
+    # 重み付きタプルの場合
+    if isinstance(first, tuple):
+        result = weighted_choice(choices)
+    else:
+        # 等確率の場合
+        result = random.choice(choices)
+
+    # 結果が文字列でない場合は空文字列を返す
+    if not isinstance(result, str):
+        return ""
+
+    return result
+
+
+# ====== ID生成 ======
+
+
+def generate_run_id(index: int = 0) -> str:
+    """
+    実行IDを生成（一意性保証）
+
+    Args:
+        index: 連番（オプション）
+
+    Returns:
+        str: 実行ID（例: "0001_a3f5b2"）
+
+    Examples:
+        >>> run_id = generate_run_id(1)
+        >>> len(run_id)
+        11
+        >>> run_id.startswith("0001_")
+        True
+    """
+    if index > 0:
+        return f"{index:04d}_{uuid.uuid4().hex[:6]}"
+    else:
+        return f"{uuid.uuid4().hex[:8]}"
+
+
+def iter_run_ids(batch_size: int = 256) -> Iterator[str]:
+    """
+    generate_run_id() と同じ形式（16進8文字）の実行IDを次々に生成
+
+    乱数バイトを batch_size 件分まとめて os.urandom から取り出すため、
+    1件ごとに uuid4 を作るより呼び出しのオーバーヘッドが小さい。
+
+    Args:
+        batch_size: 1回にまとめて用意する件数
+
+    Yields:
+        str: 実行ID（例: "a3f5b2c1"）
+
+    Examples:
+        >>> run_ids = iter_run_ids()
+        >>> len(next(run_ids))
+        8
+    """
+    while True:
+        buf = os.urandom(4 * batch_size).hex()
+        for i in range(0, len(buf), 8):
+            yield buf[i : i + 8]
+
+
+# generate_seed の既定の乱数生成器（プロセス起動時に1回だけ初期化）
+_seed_rng = random.Random()
+
+
+def generate_seed(rng: Optional[random.Random] = None) -> int:
+    """
+    シード値を生成
+
+    呼び出しごとに時刻を読まず、乱数生成器から引く。
+    同じミリ秒内に連続で呼んでも同じ値になりにくい。
+
+    Args:
+        rng: 使用する乱数生成器（省略時はモジュール共通のもの）。
+            シード固定の random.Random を渡すと再現可能になる
+
+    Returns:
+        int: シード値（0 ~ 1,999,999,999）
+
+    Examples:
+        >>> seed = generate_seed()
+        >>> 0 <= seed < 2_000_000_000
+        True
+    """
+    return (rng or _seed_rng).randrange(2_000_000_000)
+
+
+# ====== 組み合わせ計算 ======
+
+
+def calculate_combinations_count(target_axis_size: int, *other_sizes: int) -> int:
+    """
+    組み合わせの総数を計算
+
+    Args:
+        target_axis_size: 探索軸のサイズ
+        *other_sizes: その他の軸のサイズ
+
+    Returns:
+        int: 組み合わせの総数
+
+    Examples:
+        >>> calculate_combinations_count(5, 2, 3, 4)
+        120
+    """
+    return math.prod((target_axis_size, *other_sizes))
+
+
+def iter_combinations(pools: Sequence[Sequence[Any]]) -> Iterator[Tuple[Any, ...]]:
+    """
+    直積の組み合わせを通し番号から1件ずつ復元して生成
+
+    itertools.product と同じ順序（最後の軸が最も速く変わる）で生成する。
+    組み合わせのリストを作らないため、何度でも呼び直して使い回せ、
+    メモリ使用量は各軸の候補数の和に比例する。
+
+    Args:
+        pools: 各軸の候補のシーケンス
+
+    Yields:
+        Tuple[Any, ...]: 各軸から1つずつ選んだ組み合わせ
+
+    Examples:
+        >>> list(iter_combinations([(1, 2), ("a", "b")]))
+        [(1, 'a'), (1, 'b'), (2, 'a'), (2, 'b')]
+    """
+    sizes = [len(pool) for pool in pools]
+    total = math.prod(sizes)
+    reversed_pools = list(zip(reversed(pools), reversed(sizes)))
+
+    for index in range(total):
+        values = []
+        for pool, size in reversed_pools:
+            index, j = divmod(index, size)
+            values.append(pool[j])
+        yield tuple(reversed(values))
+
+
+def estimate_total_images(
+    axis_size: int, sampler_combinations: int, lora_combinations: int, repeats: int = 1
+) -> int:
+    """
+    生成される画像の総数を見積もる
+
+    Args:
+        axis_size: 探索軸のサイズ
+        sampler_combinations: サンプラーの組み合わせ数
+        lora_combinations: LoRAの組み合わせ数
+        repeats: 繰り返し回数
+
+    Returns:
+        int: 生成される画像の総数
+
+    Examples:
+        >>> estimate_total_images(10, 4, 2, repeats=2)
+        160
+    """
+    return axis_size * sampler_combinations * lora_combinations * repeats
+
+
+# ====== 時間・期間 ======
+
+
+def format_duration(seconds: float) -> str:
+    """
+    秒数を人間が読みやすい形式に変換
+
+    Args:
+        seconds: 秒数
+
+    Returns:
+        str: フォーマット済み文字列
+
+    Examples:
+        >>> format_duration(65)
+        '1分5秒'
+        >>> format_duration(3665)
+        '1時間1分5秒'
+        >>> format_duration(45)
+        '45秒'
+    """
+    if seconds < 60:
+        return f"{int(seconds)}秒"
+
+    minutes = int(seconds // 60)
+    secs = int(seconds % 60)
+
+    if minutes < 60:
+        return f"{minutes}分{secs}秒"
+
+    hours = minutes // 60
+    mins = minutes % 60
+    return f"{hours}時間{mins}分{secs}秒"
+
+
+def estimate_time_remaining(completed: int, total: int, elapsed_seconds: float) -> str:
+    """
+    残り時間を見積もる
+
+    Args:
+        completed: 完了した数
+        total: 全体の数
+        elapsed_seconds: 経過時間（秒）
+
+    Returns:
+        str: 残り時間の見積もり
+
+    Examples:
+        >>> estimate_time_remaining(25, 100, 60.0)
+        '3分0秒'
+    """
+    if completed == 0:
+        return "不明"
+
+    avg_time_per_item = elapsed_seconds / completed
+    remaining_items = total - completed
+    remaining_seconds = avg_time_per_item * remaining_items
+
+    return format_duration(remaining_seconds)
+
+
+# ====== ファイル・ディレクトリ ======
+
+
+def ensure_directory(path: Path, ensured: Optional[Set[str]] = None) -> Path:
+    """
+    ディレクトリが存在することを保証（なければ作成）
+
+    ensured を渡すと、一度保証したパスを親ディレクトリも含めてそこへ記録し、
+    2回目以降は mkdir を発行しない。集合は1回の実行の中だけで使い回すこと
+    （記録後に外部から削除されたディレクトリは作り直されない）。
+
+    Args:
+        path: ディレクトリパス
+        ensured: 保証済みのディレクトリ（文字列パス）を記録する集合
+
+    Returns:
+        Path: 作成されたディレクトリパス
+
+    Examples:
+        >>> p = ensure_directory(Path("test_dir"))
+        >>> p.exists()
+        True
+    """
+    key = os.fspath(path)
+    if ensured is not None and key in ensured:
+        return path
+    os.makedirs(key, exist_ok=True)
+    if ensured is None:
+        return path
+
+    # 親ディレクトリも存在が保証されたので、まとめて記録しておく
+    while True:
+        ensured.add(key)
+        parent = os.path.dirname(key)
+        if not parent or parent == key or parent in ensured:
+            break
+        key = parent
+    return path
+
+
+# ファイル名に使えない文字を "_" に置き換える変換表と、連続する "_" のパターン
+_UNSAFE_FILENAME_CHARS = str.maketrans(dict.fromkeys('/\\:*?"<>|', "_"))
+_REPEATED_UNDERSCORES = re.compile(r"_{2,}")
+
+
+@lru_cache(maxsize=4096)
+def safe_filename(text: str, max_length: int = 50) -> str:
+    """
+    安全なファイル名に変換（特殊文字を除去）
+
+    画像名・表情名・サンプラー名など同じ文字列で繰り返し呼ばれるため、
+    結果をキャッシュする（純粋な文字列変換なので副作用はない）。
+
+    Args:
+        text: 元のテキスト
+        max_length: 最大文字数
+
+    Returns:
+        str: 安全なファイル名
+
+    Examples:
+        >>> safe_filename("hello/world:test")
+        'hello_world_test'
+        >>> safe_filename("a" * 100, max_length=10)
+        'aaaaaaaaaa'
+    """
+    # 特殊文字を置換（1パスで全文字を変換）
+    safe = text.translate(_UNSAFE_FILENAME_CHARS)
+
+    # 連続するアンダースコアを1つに
+    safe = _REPEATED_UNDERSCORES.sub("_", safe)
+
+    # 前後の空白・アンダースコアを削除
+    safe = safe.strip("_ ")
+
+    # 長さ制限
+    if len(safe) > max_length:
+        safe = safe[:max_length]
+
+    return safe
+
+
+# ====== JSON入出力 ======
+
+
+def dump_json_bytes(data: Any, indent: bool = True, sort_keys: bool = False) -> bytes:
+    """
+    JSONをUTF-8のバイト列に変換（orjsonがあれば使用）
+
+    Args:
+        data: 変換するデータ
+        indent: 2スペースでインデントするか
+        sort_keys: キーをソートして出力するか
+
+    Returns:
+        bytes: UTF-8エンコード済みJSON（非ASCII文字はエスケープしない）
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(data, option=option)
+
+    return json.dumps(
+        data, ensure_ascii=False, indent=2 if indent else None, sort_keys=sort_keys
+    ).encode("utf-8")
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """
+    JSON文字列/バイト列を解析（orjsonがあれば使用）
+
+    Args:
+        data: JSON文字列またはUTF-8バイト列
+
+    Returns:
+        Any: 解析結果
+
+    Raises:
+        json.JSONDecodeError: JSON構文エラー（orjsonのエラーもこのサブクラス）
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_json(
+    path: Path, data: Any, indent: bool = True, sort_keys: bool = False
+) -> None:
+    """
+    JSONファイルを書き込む
+
+    Args:
+        path: 出力先パス
+        data: 書き込むデータ
+        indent: 2スペースでインデントするか
+        sort_keys: キーをソートして出力するか
+    """
+    Path(path).write_bytes(dump_json_bytes(data, indent=indent, sort_keys=sort_keys))
+
+
+# ====== プロンプト操作 ======
+
+
+def join_prompts(prompts: List[str]) -> str:
+    """
+    プロンプトのリストをカンマ区切りで結合
+    空文字列は除外する
+
+    Args:
+        prompts: プロンプトのリスト
+
+    Returns:
+        str: 結合されたプロンプト
+
+    Examples:
+        >>> join_prompts(["1girl", "smile", "", "long hair"])
+        '1girl, smile, long hair'
+    """
+    # 空文字列を除外
+    filtered = [p.strip() for p in prompts if p.strip()]
+    return ", ".join(filtered)
+
+
+def clean_prompt(prompt: str) -> str:
+    """
+    プロンプトをクリーンアップ（余分な空白・カンマを除去）
+
+    Args:
+        prompt: 元のプロンプト
+
+    Returns:
+        str: クリーンアップされたプロンプト
+
+    Examples:
+        >>> clean_prompt("1girl,  , smile,  long hair")
+        '1girl, smile, long hair'
+    """
+    # カンマで分割
+    parts = [p.strip() for p in prompt.split(",")]
+    # 空文字列を除外
+    parts = [p for p in parts if p]
+    # 再結合
+    return ", ".join(parts)
+
+
+# ====== 進捗表示 ======
+
+# 最後にプログレスバーを描画した時刻（time.monotonic()）
+_last_progress_time = 0.0
+
+
+def print_progress_bar(
+    current: int,
+    total: int,
+    prefix: str = "",
+    suffix: str = "",
+    bar_length: int = 50,
+    min_interval: float = 0.1,
+):
+    """
+    プログレスバーを表示
+
+    前回の描画から min_interval 秒経っていない場合は描画を省略する
+    （完了時は必ず描画する）。
+
+    Args:
+        current: 現在の進捗
+        total: 全体の数
+        prefix: 前置きテキスト
+        suffix: 後置きテキスト
+        bar_length: バーの長さ
+        min_interval: 描画の最小間隔（秒）
+
+    Examples:
+        >>> print_progress_bar(25, 100, prefix="Progress:", suffix="Complete")
+        Progress: |████████████▌                                       | 25/100 Complete
+    """
+    global _last_progress_time
+
+    if total == 0:
+        return
+
+    now = time.monotonic()
+    if current != total and now - _last_progress_time < min_interval:
+        return
+    _last_progress_time = now
+
+    filled_length = int(bar_length * current // total)
+    bar = "█" * filled_length + "▌" * (1 if current < total else 0)
+    bar = bar.ljust(bar_length)
+
+    line = f"\r{prefix} |{bar}| {current}/{total} {suffix}"
+    if current == total:
+        line += "\n"  # 改行
+    sys.stdout.write(line)
+    sys.stdout.flush()
+
+
+# ====== データ検証 ======
+
+
+def validate_positive_int(value: int, name: str = "value"):
+    """
+    正の整数であることを検証
+
+    Args:
+        value: 検証する値
+        name: パラメータ名（エラーメッセージ用）
+
+    Raises:
+        ValueError: 正の整数でない場合
+    """
+    if not isinstance(value, int) or value <= 0:
+        raise ValueError(f"{name} は正の整数である必要があります: {value}")
+
+
+def validate_positive_float(value: float, name: str = "value"):
+    """
+    正の浮動小数点数であることを検証
+
+    Args:
+        value: 検証する値
+        name: パラメータ名（エラーメッセージ用）
+
+    Raises:
+        ValueError: 正の浮動小数点数でない場合
+    """
+    if not isinstance(value, (int, float)) or value <= 0:
+        raise ValueError(f"{name} は正の数である必要があります: {value}")
+
+
+def validate_range(value: float, min_val: float, max_val: float, name: str = "value"):
+    """
+    値が範囲内にあることを検証
+
+    Args:
+        value: 検証する値
+        min_val: 最小値
+        max_val: 最大値
+        name: パラメータ名（エラーメッセージ用）
+
+    Raises:
+        ValueError: 範囲外の場合
+    """
+    if not (min_val <= value <= max_val):
+        raise ValueError(
+            f"{name} は {min_val} から {max_val} の範囲である必要があります: {value}"
+        )
+
+
+# ====== ロギングヘルパー ======
+
+
+def setup_logging(
+    level: int = logging.INFO, log_file: Path = None, log_format: str = None
+):
+    """
+    ルートロガーをセットアップ（すべてのモジュールに適用）
+
+    Args:
+        level: ログレベル
+        log_file: ログファイルパス（Noneの場合はコンソールのみ）
+        log_format: ログフォーマット
+    """
+    # デフォルトのフォーマット
+    if log_format is None:
+        log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+    # ルートロガーを取得
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+
+    # 既存のハンドラーをクリア
+    root_logger.handlers.clear()
+
+    # フォーマッター
+    formatter = logging.Formatter(log_format, datefmt="%Y-%m-%d %H:%M:%S")
+
+    # コンソールハンドラー
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    console_handler.setLevel(level)
+    root_logger.addHandler(console_handler)
+
+    # ファイルハンドラー（オプション）
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(formatter)
+        file_handler.setLevel(level)
+        root_logger.addHandler(file_handler)
+
+
+def setup_logger(
+    name: str = __name__, level: int = logging.INFO, log_file: Path = None
+) -> logging.Logger:
+    """
+    個別のロガーをセットアップ（後方互換性のため残す）
+
+    Note:
+        新しいコードでは setup_logging() を推奨
+        この関数は既存コードとの互換性のために残されています
+
+    Args:
+        name: ロガー名
+        level: ログレベル
+        log_file: ログファイルパス（Noneの場合はコンソールのみ）
+
+    Returns:
+        logging.Logger: 設定されたロガー
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+
+    # ハンドラーをクリア
+    logger.handlers.clear()
+
+    # フォーマッター
+    formatter = logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    # コンソールハンドラー
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    logger.addHandler(console_handler)
+
+    # ファイルハンドラー（オプション）
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+    return logger
+
+
+# ====== 使用例 ======
+
+
+def example_usage():
+    """使用例"""
+
+    print("=== ランダム選択 ===")
+    choices = [("a", 2.0), ("b", 1.0), ("c", 0.5)]
+    print(f"重み付き選択: {weighted_choice(choices)}")
+
+    print("\n=== ID生成 ===")
+    print(f"実行ID: {generate_run_id(1)}")
+    print(f"シード: {generate_seed()}")
+
+    print("\n=== 組み合わせ計算 ===")
+    count = calculate_combinations_count(10, 2, 3, 4)
+    print(f"組み合わせ数: {count}")
+
+    total_images = estimate_total_images(10, 4, 2, repeats=2)
+    print(f"総画像数: {total_images}")
+
+    print("\n=== 時間フォーマット ===")
+    print(f"65秒 = {format_duration(65)}")
+    print(f"3665秒 = {format_duration(3665)}")
+
+    print("\n=== 残り時間見積もり ===")
+    remaining = estimate_time_remaining(25, 100, 60.0)
+    print(f"残り時間: {remaining}")
+
+    print("\n=== ファイル名 ===")
+    safe = safe_filename("hello/world:test*?")
+    print(f"安全なファイル名: {safe}")
+
+    print("\n=== プロンプト操作 ===")
+    prompts = ["1girl", "", "smile", "  ", "long hair"]
+    joined = join_prompts(prompts)
+    print(f"結合: {joined}")
+
+    dirty = "1girl,  , smile,  long hair"
+    clean = clean_prompt(dirty)
+    print(f"クリーンアップ: {clean}")
+
+    print("\n=== プログレスバー ===")
+    for i in range(101):
+        print_progress_bar(i, 100, prefix="Progress:", suffix="Complete")
+        time.sleep(0.01)
+
+
+if __name__ == "__main__":
+    example_usage()
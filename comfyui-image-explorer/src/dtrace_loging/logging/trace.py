@@ -1,91 +1,115 @@
-from __future__ import annotations
-
-import functools
-import inspect
-import logging
-import time
-from typing import Any, Callable, Optional, ParamSpec, TypeVar
-
-P = ParamSpec("P")
-R = TypeVar("R")
-
-
-def _default_mask(value: Any) -> Any:  # pylint: disable=missing-trace-io
-    # 必要に応じて拡張：パスワード・トークン等を伏せる
-    return value
-
-
-def trace_io(  # pylint: disable=missing-trace-io
-    *,
-    logger: Optional[logging.Logger] = None,
-    level: int = logging.DEBUG,
-    mask: Callable[[Any], Any] = _default_mask,
-    log_return: bool = True,
-    include_args: bool = True,
-) -> Callable[[Callable[P, R]], Callable[P, R]]:
-    """
-    関数の入出力・所要時間・例外をログ出力するデコレータ。
-
-    - logger未指定なら、関数の属するモジュール名で取得
-    - maskで引数/戻り値をマスク可能
-    - async関数にも対応
-    """
-
-    def decorator(func: Callable[P, R]) -> Callable[P, R]:
-        _logger = logger or logging.getLogger(func.__module__)
-        qualname = f"{func.__module__}.{getattr(func, '__qualname__', func.__name__)}"
-        is_async = inspect.iscoroutinefunction(func)
-
-        if is_async:
-
-            @functools.wraps(func)
-            async def async_wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-                start = time.perf_counter()
-                if _logger.isEnabledFor(level):
-                    payload = (
-                        {"args": mask(args), "kwargs": mask(kwargs)}
-                        if include_args
-                        else {}
-                    )
-                    _logger.log(level, "START %s %s", qualname, payload)
-                try:
-                    result = await func(*args, **kwargs)
-                    elapsed_ms = (time.perf_counter() - start) * 1000
-                    if _logger.isEnabledFor(level):
-                        out = {"return": mask(result)} if log_return else {}
-                        _logger.log(
-                            level, "END   %s %s (%.1fms)", qualname, out, elapsed_ms
-                        )
-                    return result
-                except Exception:
-                    elapsed_ms = (time.perf_counter() - start) * 1000
-                    _logger.exception("ERR   %s (%.1fms)", qualname, elapsed_ms)
-                    raise
-
-            return async_wrapper  # type: ignore[return-value]
-
-        @functools.wraps(func)
-        def sync_wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-            start = time.perf_counter()
-            if _logger.isEnabledFor(level):
-                payload = (
-                    {"args": mask(args), "kwargs": mask(kwargs)} if include_args else {}
-                )
-                _logger.log(level, "START %s %s", qualname, payload)
-            try:
-                result = func(*args, **kwargs)
-                elapsed_ms = (time.perf_counter() - start) * 1000
-                if _logger.isEnabledFor(level):
-                    out = {"return": mask(result)} if log_return else {}
-                    _logger.log(
-                        level, "END   %s %s (%.1fms)", qualname, out, elapsed_ms
-                    )
-                return result
-            except Exception:
-                elapsed_ms = (time.perf_counter() - start) * 1000
-                _logger.exception("ERR   %s (%.1fms)", qualname, elapsed_ms)
-                raise
-
-        return sync_wrapper
-
-    return decorator
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, ParamSpec, TypeVar
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+def _default_mask(value: Any) -> Any:  # pylint: disable=missing-trace-io
+    # 必要に応じて拡張：パスワード・トークン等を伏せる
+    return value
+
+
+class _LazyPayload:
+    """
+    ログに出す引数/戻り値の dict を、実際にフォーマットされる時まで組み立てない
+
+    ロガーが有効でもハンドラ側のレベルで捨てられる場合は mask も呼ばれない。
+    """
+
+    __slots__ = ("_mask", "_items")
+
+    def __init__(self, mask: Callable[[Any], Any], items: Dict[str, Any]) -> None:
+        self._mask = mask
+        self._items = items
+
+    def __str__(self) -> str:
+        return str({key: self._mask(value) for key, value in self._items.items()})
+
+
+def trace_io(  # pylint: disable=missing-trace-io
+    *,
+    logger: Optional[logging.Logger] = None,
+    level: int = logging.DEBUG,
+    mask: Callable[[Any], Any] = _default_mask,
+    log_return: bool = True,
+    include_args: bool = True,
+) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """
+    関数の入出力・所要時間・例外をログ出力するデコレータ。
+
+    - logger未指定なら、関数の属するモジュール名で取得
+    - maskで引数/戻り値をマスク可能
+    - async関数にも対応
+    """
+
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        _logger = logger or logging.getLogger(func.__module__)
+        qualname = f"{func.__module__}.{getattr(func, '__qualname__', func.__name__)}"
+        # async def かどうかはコードオブジェクトのフラグだけで判定する
+        # （inspect.iscoroutinefunction のような __wrapped__ 等の展開はしない）
+        code = getattr(func, "__code__", None)
+        is_async = code is not None and bool(code.co_flags & inspect.CO_COROUTINE)
+        # 呼び出しごとの属性・グローバル参照を避けるため、デコレート時に束縛しておく
+        perf_counter = time.perf_counter
+        is_enabled = _logger.isEnabledFor
+        log = _logger.log
+
+        if is_async:
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+                start = perf_counter()
+                if is_enabled(level):
+                    payload = (
+                        _LazyPayload(mask, {"args": args, "kwargs": kwargs})
+                        if include_args
+                        else {}
+                    )
+                    log(level, "START %s %s", qualname, payload)
+                try:
+                    result = await func(*args, **kwargs)
+                    elapsed_ms = (perf_counter() - start) * 1000
+                    if is_enabled(level):
+                        out = (
+                            _LazyPayload(mask, {"return": result}) if log_return else {}
+                        )
+                        log(level, "END   %s %s (%.1fms)", qualname, out, elapsed_ms)
+                    return result
+                except Exception:
+                    elapsed_ms = (perf_counter() - start) * 1000
+                    _logger.exception("ERR   %s (%.1fms)", qualname, elapsed_ms)
+                    raise
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def sync_wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            start = perf_counter()
+            if is_enabled(level):
+                payload = (
+                    _LazyPayload(mask, {"args": args, "kwargs": kwargs})
+                    if include_args
+                    else {}
+                )
+                log(level, "START %s %s", qualname, payload)
+            try:
+                result = func(*args, **kwargs)
+                elapsed_ms = (perf_counter() - start) * 1000
+                if is_enabled(level):
+                    out = _LazyPayload(mask, {"return": result}) if log_return else {}
+                    log(level, "END   %s %s (%.1fms)", qualname, out, elapsed_ms)
+                return result
+            except Exception:
+                elapsed_ms = (perf_counter() - start) * 1000
+                _logger.exception("ERR   %s (%.1fms)", qualname, elapsed_ms)
+                raise
+
+        return sync_wrapper
+
+    return decorator
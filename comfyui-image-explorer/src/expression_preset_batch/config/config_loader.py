@@ -1,457 +1,631 @@
-# src/expression_preset_batch/config/config_loader.py
-
-from __future__ import annotations
-
-import json
-import logging
-from dataclasses import dataclass
-from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-import yaml
-
-from dtrace_loging.logging.trace import trace_io
-from expression_preset_batch.models import (
-    ExpressionPresetNodeMapping,
-    normalize_expressions,
-)
-
-logger = logging.getLogger(__name__)
-
-
-@trace_io(level=logging.DEBUG)
-def _optional_str_list(d: Dict[str, Any], key: str, default: List[str]) -> List[str]:
-    v = d.get(key, default)
-    if v is None:
-        return list(default)
-    if not isinstance(v, list) or not all(isinstance(x, str) and x.strip() for x in v):
-        raise ValueError(f"Invalid '{key}' (must be list[str]): {v!r}")
-    return [x.strip() for x in v]
-
-
-@trace_io(level=logging.DEBUG)
-def _optional_num_list(
-    d: Dict[str, Any], key: str, default: List[float]
-) -> List[float]:
-    v = d.get(key, default)
-    if v is None:
-        return list(default)
-    if not isinstance(v, list) or not all(isinstance(x, (int, float)) for x in v):
-        raise ValueError(f"Invalid '{key}' (must be list[number]): {v!r}")
-    return [float(x) for x in v]
-
-
-@trace_io(level=logging.DEBUG)
-def _resolve_path(base_dir: Path, raw: str) -> Path:
-    p = Path(raw)
-    if p.is_absolute():
-        return p
-    return (base_dir / p).resolve()
-
-
-@trace_io(level=logging.DEBUG)
-def _require_str(d: Dict[str, Any], key: str, ctx: str) -> str:
-    v = d.get(key)
-    if not isinstance(v, str) or not v.strip():
-        raise ValueError(f"Missing or invalid '{key}' in {ctx}")
-    return v.strip()
-
-
-@trace_io(level=logging.DEBUG)
-def _optional_str(d: Dict[str, Any], key: str, default: str) -> str:
-    v = d.get(key, default)
-    return v.strip() if isinstance(v, str) and v.strip() else default
-
-
-@trace_io(level=logging.DEBUG)
-def _optional_bool(d: Dict[str, Any], key: str, default: bool) -> bool:
-    v = d.get(key, default)
-    return bool(v) if isinstance(v, bool) else default
-
-
-@trace_io(level=logging.DEBUG)
-def _optional_int(d: Dict[str, Any], key: str, default: int) -> int:
-    v = d.get(key, default)
-    if v is None:
-        return default
-    if not isinstance(v, int):
-        raise ValueError(f"Invalid '{key}' (must be int): {v!r}")
-    return v
-
-
-@trace_io(level=logging.DEBUG)
-def _optional_float(d: Dict[str, Any], key: str, default: float) -> float:
-    v = d.get(key, default)
-    if v is None:
-        return default
-    if not isinstance(v, (int, float)):
-        raise ValueError(f"Invalid '{key}' (must be number): {v!r}")
-    return float(v)
-
-
-@dataclass(frozen=True)
-class EPBWorkflowRef:
-    workflow_json: Path
-    output_root: Path
-
-    @trace_io(level=logging.DEBUG)
-    def __post_init__(self) -> None:
-        if not self.workflow_json.exists():
-            raise FileNotFoundError(f"workflow_json not found: {self.workflow_json}")
-
-
-@dataclass(frozen=True)
-class EPBRunConfig:
-    comfy_url: str
-    poll_interval: float = 1.0
-    timeout_sec: Optional[float] = 600.0
-    repeats: int = 1
-
-    seed_strategy: str = "time"  # time|increment|fixed
-    seed_base: int = 0
-
-    @trace_io(level=logging.DEBUG)
-    def __post_init__(self) -> None:
-        if self.repeats <= 0:
-            raise ValueError("repeats must be > 0")
-        if self.poll_interval <= 0:
-            raise ValueError("poll_interval must be > 0")
-        if self.timeout_sec is not None and self.timeout_sec <= 0:
-            raise ValueError("timeout_sec must be > 0 when specified")
-        if self.seed_strategy not in ("time", "increment", "fixed"):
-            raise ValueError("seed_strategy must be one of: time, increment, fixed")
-
-
-class ConfigLoader:
-    """
-    推奨スキーマ（例）:
-
-    comfy_url: "http://127.0.0.1:8188"
-    workflow_json: "./workflows/epb.json"
-    output_root: "./outputs"
-
-    input_image:
-      node_id: "10"
-      input_name: "image"
-      upload: true
-      upload_type: "input"
-      upload_subfolder: ""
-      overwrite: false
-
-    expression_preset:
-      node_id: "123"
-      expression_input_name: "expression"
-      expressions: [neutral, smile, wink]
-
-    save_image:
-      node_id: "999"
-      filename_prefix_template: "{image}/{expr}/{run}/img"
-
-    seed_node:
-      node_id: "6"
-      input_name: "seed"
-
-    run:
-      repeats: 3
-      poll_interval: 1.0
-      timeout_sec: 600
-      seed_strategy: "time"
-      seed_base: 0
-    """
-
-    @trace_io(level=logging.DEBUG)
-    def __init__(self, config_path: Path):
-        self.config_path = config_path
-        self.base_dir = config_path.parent.resolve()
-
-        if config_path.suffix.lower() in (".yaml", ".yml"):
-            with config_path.open("r", encoding="utf-8") as f:
-                raw = yaml.safe_load(f) or {}
-        elif config_path.suffix.lower() == ".json":
-            with config_path.open("r", encoding="utf-8") as f:
-                raw = json.load(f) or {}
-        else:
-            raise ValueError(f"Unsupported config type: {config_path}")
-
-        if not isinstance(raw, dict):
-            raise ValueError(f"Config root must be dict: {config_path}")
-
-        self.raw: Dict[str, Any] = raw
-
-    @trace_io(level=logging.DEBUG)
-    def load_workflow(self) -> EPBWorkflowRef:
-        workflow_json_raw = self.raw.get("workflow_json")
-        if not isinstance(workflow_json_raw, str) or not workflow_json_raw.strip():
-            raise ValueError("Missing workflow_json")
-
-        output_root_raw = self.raw.get("output_root", "./outputs")
-        if not isinstance(output_root_raw, str) or not output_root_raw.strip():
-            output_root_raw = "./outputs"
-
-        logger.debug("Loaded workflow_json: %s", workflow_json_raw)
-        logger.debug("self.base_dir: %s", self.base_dir)
-        return EPBWorkflowRef(
-            workflow_json=_resolve_path(self.base_dir, workflow_json_raw.strip()),
-            output_root=_resolve_path(self.base_dir, output_root_raw.strip()),
-        )
-
-    @trace_io(level=logging.DEBUG)
-    def load_input_image(self) -> Dict[str, Any]:
-        sec = self.raw.get("input_image")
-        if not isinstance(sec, dict):
-            raise ValueError("Missing 'input_image' section (must be mapping)")
-
-        node_id = _require_str(sec, "node_id", "input_image")
-        input_name = _optional_str(sec, "input_name", "image")
-
-        upload = _optional_bool(sec, "upload", True)
-        upload_type = _optional_str(sec, "upload_type", "input")
-        upload_subfolder = _optional_str(sec, "upload_subfolder", "")
-        overwrite = _optional_bool(sec, "overwrite", False)
-
-        return {
-            "node_id": node_id,
-            "input_name": input_name,
-            "upload": upload,
-            "upload_type": upload_type,
-            "upload_subfolder": upload_subfolder,
-            "overwrite": overwrite,
-        }
-
-    @trace_io(level=logging.DEBUG)
-    def load_expression_preset(self) -> Dict[str, Any]:
-        sec = self.raw.get("expression_preset")
-        if not isinstance(sec, dict):
-            raise ValueError("Missing 'expression_preset' section (must be mapping)")
-
-        node_id = _require_str(sec, "node_id", "expression_preset")
-        input_name = _optional_str(sec, "expression_input_name", "expression")
-
-        expressions_raw = sec.get("expressions")
-        if not isinstance(expressions_raw, list):
-            raise ValueError("expression_preset.expressions must be a list of strings")
-
-        expressions = normalize_expressions(expressions_raw)
-        if not expressions:
-            raise ValueError(
-                "expression_preset.expressions must contain at least one expression"
-            )
-
-        mapping = ExpressionPresetNodeMapping(
-            node_id=node_id, expression_input_name=input_name
-        )
-        mapping.validate()
-
-        return {"mapping": mapping, "expressions": expressions}
-
-    @trace_io(level=logging.DEBUG)
-    def load_save_image(self) -> Dict[str, Any]:
-        sec = self.raw.get("save_image", {})
-        if sec is None:
-            sec = {}
-        if not isinstance(sec, dict):
-            raise ValueError("save_image must be mapping when specified")
-
-        template = _optional_str(
-            sec, "filename_prefix_template", "{image}/{expr}/{run}/img"
-        )
-
-        nodes_raw = sec.get("save_image_nodes")
-        nodes: list[dict[str, str]] = []
-
-        # save_image_nodes は「指定されていれば list」として読む（無指定なら空でOK）
-        if nodes_raw is not None:
-            if not isinstance(nodes_raw, list):
-                raise ValueError(
-                    "save_image.save_image_nodes must be a list when specified"
-                )
-
-            for i, ent in enumerate(nodes_raw):
-                if not isinstance(ent, dict):
-                    raise ValueError(
-                        f"save_image.save_image_nodes[{i}] must be mapping"
-                    )
-
-                node_id = ent.get("node_id")
-                if not isinstance(node_id, str) or not node_id.strip():
-                    raise ValueError(
-                        f"save_image.save_image_nodes[{i}].node_id must be non-empty string"
-                    )
-
-                suffix = ent.get("suffix", "")
-                if suffix is None:
-                    suffix = ""
-                if not isinstance(suffix, str):
-                    raise ValueError(
-                        f"save_image.save_image_nodes[{i}].suffix must be string when specified"
-                    )
-
-                nodes.append(
-                    {
-                        "node_id": node_id.strip(),
-                        "suffix": suffix.strip(),
-                    }
-                )
-
-        return {
-            "nodes": nodes,  # ← 単数node_idは廃止。常にnodes。
-            "filename_prefix_template": template,
-        }
-
-    @trace_io(level=logging.DEBUG)
-    def load_seed_node(self) -> Dict[str, Any]:
-        sec = self.raw.get("seed_node", {})
-        if sec is None:
-            sec = {}
-        if not isinstance(sec, dict):
-            raise ValueError("seed_node must be mapping when specified")
-
-        node_id = sec.get("node_id")
-        if node_id is None:
-            return {"node_id": None, "input_name": "seed"}
-
-        if not isinstance(node_id, str) or not node_id.strip():
-            raise ValueError(
-                "seed_node.node_id must be non-empty string when specified"
-            )
-
-        input_name = _optional_str(sec, "input_name", "seed")
-        return {"node_id": node_id.strip(), "input_name": input_name}
-
-    @trace_io(level=logging.DEBUG)
-    def load_run(self) -> EPBRunConfig:
-        run = self.raw.get("run", {})
-        if run is None:
-            run = {}
-        if not isinstance(run, dict):
-            raise ValueError("run must be mapping when specified")
-
-        comfy_url = (
-            _require_str(self.raw, "comfy_url", "root")
-            if "comfy_url" in self.raw
-            else _require_str(run, "comfy_url", "run")
-        )
-        repeats = _optional_int(run, "repeats", 1)
-        poll_interval = _optional_float(run, "poll_interval", 1.0)
-
-        timeout_sec_val = run.get("timeout_sec", 600.0)
-        if timeout_sec_val is None:
-            timeout_sec = None
-        else:
-            if not isinstance(timeout_sec_val, (int, float)):
-                raise ValueError("run.timeout_sec must be number or null")
-            timeout_sec = float(timeout_sec_val)
-
-        seed_strategy = _optional_str(run, "seed_strategy", "time")
-        seed_base = _optional_int(run, "seed_base", 0)
-
-        return EPBRunConfig(
-            comfy_url=comfy_url,
-            poll_interval=poll_interval,
-            timeout_sec=timeout_sec,
-            repeats=repeats,
-            seed_strategy=seed_strategy,
-            seed_base=seed_base,
-        )
-
-    @trace_io(level=logging.DEBUG)
-    def load_sampler_node(self) -> Dict[str, Any]:
-        sec = self.raw.get("sampler_node", {})
-        if sec is None:
-            sec = {}
-        if not isinstance(sec, dict):
-            raise ValueError("sampler_node must be mapping when specified")
-
-        node_id = sec.get("node_id")
-        if node_id is None:
-            # sampler差し替え無効（＝既存挙動）
-            return {"node_id": None}
-
-        if not isinstance(node_id, str) or not node_id.strip():
-            raise ValueError(
-                "sampler_node.node_id must be non-empty string when specified"
-            )
-
-        return {
-            "node_id": node_id.strip(),
-            "steps_input": _optional_str(sec, "steps_input", "steps"),
-            "cfg_input": _optional_str(sec, "cfg_input", "cfg"),
-            "denoise_input": _optional_str(sec, "denoise_input", "denoise"),
-            "sampler_name_input": _optional_str(
-                sec, "sampler_name_input", "sampler_name"
-            ),
-            "scheduler_input": _optional_str(sec, "scheduler_input", "scheduler"),
-        }
-
-    @trace_io(level=logging.DEBUG)
-    def load_sampler_sweep(self) -> Optional[Dict[str, Any]]:
-        sec = self.raw.get("sampler_sweep")
-        if sec is None:
-            return None
-        if not isinstance(sec, dict):
-            raise ValueError("sampler_sweep must be mapping when specified")
-
-        steps = sec.get("steps")
-        cfg = sec.get("cfg")
-        denoise = sec.get("denoise")
-        sampler = sec.get("sampler")
-        scheduler = sec.get("scheduler")
-
-        # “指定されたら必須キーは全部 list で” ルール（取りこぼし事故防止）
-        for k, v in [
-            ("steps", steps),
-            ("cfg", cfg),
-            ("denoise", denoise),
-            ("sampler", sampler),
-            ("scheduler", scheduler),
-        ]:
-            if not isinstance(v, list) or not v:
-                raise ValueError(f"sampler_sweep.{k} must be non-empty list")
-
-        if not all(isinstance(x, int) for x in steps):
-            raise ValueError("sampler_sweep.steps must be list[int]")
-        if not all(isinstance(x, (int, float)) for x in cfg):
-            raise ValueError("sampler_sweep.cfg must be list[number]")
-        if not all(isinstance(x, (int, float)) for x in denoise):
-            raise ValueError("sampler_sweep.denoise must be list[number]")
-        if not all(isinstance(x, str) and x.strip() for x in sampler):
-            raise ValueError("sampler_sweep.sampler must be list[str]")
-        if not all(isinstance(x, str) and x.strip() for x in scheduler):
-            raise ValueError("sampler_sweep.scheduler must be list[str]")
-
-        return {
-            "steps": [int(x) for x in steps],
-            "cfg": [float(x) for x in cfg],
-            "denoise": [float(x) for x in denoise],
-            "sampler": [x.strip() for x in sampler],
-            "scheduler": [x.strip() for x in scheduler],
-        }
-
-    @trace_io(level=logging.DEBUG)
-    def load_all(self) -> Dict[str, Any]:
-        workflow = self.load_workflow()
-        input_image = self.load_input_image()
-        ep = self.load_expression_preset()
-        save_image = self.load_save_image()
-        seed_node = self.load_seed_node()
-        sampler_node = self.load_sampler_node()
-        sampler_sweep = self.load_sampler_sweep()
-        run = self.load_run()
-
-        return {
-            "workflow": workflow,
-            "run": run,
-            "input_image": input_image,
-            "expression_preset": ep["mapping"],
-            "expressions": ep["expressions"],
-            "save_image": save_image,
-            "seed_node": seed_node,
-            "sampler_node": sampler_node,
-            "sampler_sweep": sampler_sweep,
-            "output_root": workflow.output_root,
-        }
-
-
-@trace_io(level=logging.DEBUG)
-def quick_load(config_path: Path) -> Dict[str, Any]:
-    return ConfigLoader(config_path).load_all()
+# src/expression_preset_batch/config/config_loader.py
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import yaml
+
+try:
+    # libyaml があれば C 実装のローダーを使う（無ければ純Python実装）
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover
+    # 未インストール環境では標準ライブラリの json を使う
+    _json_loads = json.loads
+
+from dtrace_loging.logging.trace import trace_io
+from expression_preset_batch.models import (
+    ExpressionPresetNodeMapping,
+    normalize_expressions,
+)
+
+logger = logging.getLogger(__name__)
+
+# 検証で使う定数（呼び出しごとに組み立てない）
+# _optional_num の types に渡す型タプル（ラベルの判定も identity で行う）
+_INT_TYPES: Tuple[type, ...] = (int,)
+_NUM_TYPES: Tuple[type, ...] = (int, float)
+_YAML_SUFFIXES = frozenset((".yaml", ".yml"))
+_SEED_STRATEGIES = frozenset(("time", "increment", "fixed"))
+
+
+# 以下の小さな検証ヘルパーは設定項目ごとに呼ばれるため trace_io は付けない
+# （不正な値は ValueError のメッセージで分かる）
+def _optional_str_list(  # pylint: disable=missing-trace-io
+    d: Dict[str, Any], key: str, default: List[str]
+) -> List[str]:
+    # キー未指定（または null）なら既定値を検証し直さずにコピーだけ返す
+    v = d.get(key)
+    if v is None:
+        return list(default)
+    if not isinstance(v, list) or not all(type(x) is str for x in v):
+        raise ValueError(f"Invalid '{key}' (must be list[str]): {v!r}")
+    out = [x.strip() for x in v]
+    if not all(out):
+        raise ValueError(f"Invalid '{key}' (must be list[str]): {v!r}")
+    return out
+
+
+def _optional_num_list(  # pylint: disable=missing-trace-io
+    d: Dict[str, Any], key: str, default: List[float]
+) -> List[float]:
+    # キー未指定（または null）なら既定値を検証し直さずにコピーだけ返す
+    v = d.get(key)
+    if v is None:
+        return list(default)
+    if not isinstance(v, list) or not all(type(x) in _NUM_TYPES for x in v):
+        raise ValueError(f"Invalid '{key}' (must be list[number]): {v!r}")
+    return [float(x) for x in v]
+
+
+def _resolve_path(  # pylint: disable=missing-trace-io
+    base_dir: Path, raw: str
+) -> Path:
+    if os.path.isabs(raw):
+        return Path(raw)
+    # base_dir は解決済みなので、".." の畳み込みだけ文字列で行い
+    # realpath の stat を避ける
+    return Path(os.path.normpath(os.path.join(base_dir, raw)))
+
+
+def _require_str(  # pylint: disable=missing-trace-io
+    d: Dict[str, Any], key: str, ctx: str
+) -> str:
+    v = d.get(key)
+    # strip() は1回だけ呼び、その結果で空判定と戻り値を兼ねる
+    s = v.strip() if type(v) is str else ""
+    if not s:
+        raise ValueError(f"Missing or invalid '{key}' in {ctx}")
+    return s
+
+
+def _optional_str(  # pylint: disable=missing-trace-io
+    d: Dict[str, Any], key: str, default: str
+) -> str:
+    v = d.get(key, default)
+    if type(v) is not str:
+        return default
+    return v.strip() or default
+
+
+def _optional_bool(  # pylint: disable=missing-trace-io
+    d: Dict[str, Any], key: str, default: bool
+) -> bool:
+    v = d.get(key, default)
+    return v if type(v) is bool else default
+
+
+def _optional_num(  # pylint: disable=missing-trace-io
+    d: Dict[str, Any], key: str, default: Any, types: Tuple[type, ...]
+) -> Any:
+    v = d.get(key)
+    if v is None:
+        return default
+    # bool は int のサブクラスだが、true/false を数値として受け付けないよう型で判定する
+    if type(v) not in types:
+        label = "int" if types is _INT_TYPES else "number"
+        raise ValueError(f"Invalid '{key}' (must be {label}): {v!r}")
+    # 末尾の型へ揃える（_INT_TYPES なら int、_NUM_TYPES なら float）
+    return types[-1](v)
+
+
+def _sweep_int_list(v: Any, ctx: str) -> List[int]:  # pylint: disable=missing-trace-io
+    if not isinstance(v, list) or not v:
+        raise ValueError(f"{ctx} must be non-empty list")
+    out: List[int] = []
+    append = out.append
+    for x in v:
+        if type(x) is not int:
+            raise ValueError(f"{ctx} must be list[int]")
+        append(x)
+    return out
+
+
+def _sweep_num_list(  # pylint: disable=missing-trace-io
+    v: Any, ctx: str
+) -> List[float]:
+    if not isinstance(v, list) or not v:
+        raise ValueError(f"{ctx} must be non-empty list")
+    out: List[float] = []
+    append = out.append
+    for x in v:
+        if type(x) not in _NUM_TYPES:
+            raise ValueError(f"{ctx} must be list[number]")
+        append(float(x))
+    return out
+
+
+def _sweep_str_list(v: Any, ctx: str) -> List[str]:  # pylint: disable=missing-trace-io
+    if not isinstance(v, list) or not v:
+        raise ValueError(f"{ctx} must be non-empty list")
+    out: List[str] = []
+    append = out.append
+    for x in v:
+        s = x.strip() if type(x) is str else ""
+        if not s:
+            raise ValueError(f"{ctx} must be list[str]")
+        append(s)
+    return out
+
+
+@dataclass(frozen=True, slots=True)
+class EPBWorkflowRef:
+    workflow_json: Path
+    output_root: Path
+
+    @trace_io(level=logging.DEBUG)
+    def __post_init__(self) -> None:
+        if not self.workflow_json.exists():
+            raise FileNotFoundError(f"workflow_json not found: {self.workflow_json}")
+
+
+@dataclass(frozen=True, slots=True)
+class EPBInputImageConfig:
+    node_id: str
+    input_name: str = "image"
+    # ComfyUI の input/ 等へアップロードするか（False ならサーバ側に既にある前提）
+    upload: bool = True
+    upload_type: str = "input"
+    upload_subfolder: str = ""
+    overwrite: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class EPBRunConfig:
+    comfy_url: str
+    poll_interval: float = 1.0
+    # ポーリングのバックオフ上限（秒）
+    max_poll_interval: float = 16.0
+    timeout_sec: Optional[float] = 600.0
+    repeats: int = 1
+    # ComfyUIのキューへ先行投入しておく最大件数
+    pipeline_depth: int = 4
+    # 入力画像を並列アップロードするスレッド数
+    upload_workers: int = 8
+    # /history のレスポンスを meta.json の隣に history.json として保存するか
+    save_history: bool = False
+
+    seed_strategy: str = "time"  # time|increment|fixed
+    seed_base: int = 0
+
+    @trace_io(level=logging.DEBUG)
+    def __post_init__(self) -> None:
+        if self.repeats <= 0:
+            raise ValueError("repeats must be > 0")
+        if self.poll_interval <= 0:
+            raise ValueError("poll_interval must be > 0")
+        if self.max_poll_interval < self.poll_interval:
+            raise ValueError("max_poll_interval must be >= poll_interval")
+        if self.timeout_sec is not None and self.timeout_sec <= 0:
+            raise ValueError("timeout_sec must be > 0 when specified")
+        if self.pipeline_depth <= 0:
+            raise ValueError("pipeline_depth must be > 0")
+        if self.upload_workers <= 0:
+            raise ValueError("upload_workers must be > 0")
+        if self.seed_strategy not in _SEED_STRATEGIES:
+            raise ValueError("seed_strategy must be one of: time, increment, fixed")
+
+
+class ConfigLoader:
+    """
+    推奨スキーマ（例）:
+
+    comfy_url: "http://127.0.0.1:8188"
+    workflow_json: "./workflows/epb.json"
+    output_root: "./outputs"
+
+    input_image:
+      node_id: "10"
+      input_name: "image"
+      upload: true
+      upload_type: "input"
+      upload_subfolder: ""
+      overwrite: false
+
+    expression_preset:
+      node_id: "123"
+      expression_input_name: "expression"
+      expressions: [neutral, smile, wink]
+
+    save_image:
+      node_id: "999"
+      filename_prefix_template: "{image}/{expr}/{run}/img"
+
+    seed_node:
+      node_id: "6"
+      input_name: "seed"
+
+    run:
+      repeats: 3
+      poll_interval: 1.0
+      max_poll_interval: 16.0
+      timeout_sec: 600
+      pipeline_depth: 4
+      upload_workers: 8
+      save_history: false
+      seed_strategy: "time"
+      seed_base: 0
+    """
+
+    @trace_io(level=logging.DEBUG)
+    def __init__(self, config_path: Path):
+        self.config_path = config_path
+        self.base_dir = config_path.parent.resolve()
+
+        suffix = config_path.suffix.lower()
+        if suffix in _YAML_SUFFIXES:
+            # バイト列のまま渡し、UTF-8 のデコードもローダー側に任せる
+            raw = yaml.load(config_path.read_bytes(), Loader=_YamlLoader) or {}
+        elif suffix == ".json":
+            raw = _json_loads(config_path.read_bytes()) or {}
+        else:
+            raise ValueError(f"Unsupported config type: {config_path}")
+
+        if not isinstance(raw, dict):
+            raise ValueError(f"Config root must be dict: {config_path}")
+
+        self.raw: Dict[str, Any] = raw
+
+    @cached_property
+    @trace_io(level=logging.DEBUG)
+    def workflow(self) -> EPBWorkflowRef:
+        workflow_json_raw = self.raw.get("workflow_json")
+        if isinstance(workflow_json_raw, str):
+            workflow_json_raw = workflow_json_raw.strip()
+        if not workflow_json_raw or not isinstance(workflow_json_raw, str):
+            raise ValueError("Missing workflow_json")
+
+        output_root_raw = self.raw.get("output_root")
+        if isinstance(output_root_raw, str):
+            output_root_raw = output_root_raw.strip()
+        if not output_root_raw or not isinstance(output_root_raw, str):
+            output_root_raw = "./outputs"
+
+        logger.debug("Loaded workflow_json: %s", workflow_json_raw)
+        logger.debug("self.base_dir: %s", self.base_dir)
+        return EPBWorkflowRef(
+            workflow_json=_resolve_path(self.base_dir, workflow_json_raw),
+            output_root=_resolve_path(self.base_dir, output_root_raw),
+        )
+
+    @cached_property
+    @trace_io(level=logging.DEBUG)
+    def input_image(self) -> EPBInputImageConfig:
+        sec = self.raw.get("input_image")
+        if not isinstance(sec, dict):
+            raise ValueError("Missing 'input_image' section (must be mapping)")
+
+        node_id = _require_str(sec, "node_id", "input_image")
+        input_name = _optional_str(sec, "input_name", "image")
+
+        upload = _optional_bool(sec, "upload", True)
+        upload_type = _optional_str(sec, "upload_type", "input")
+        upload_subfolder = _optional_str(sec, "upload_subfolder", "")
+        overwrite = _optional_bool(sec, "overwrite", False)
+
+        return EPBInputImageConfig(
+            node_id=node_id,
+            input_name=input_name,
+            upload=upload,
+            upload_type=upload_type,
+            upload_subfolder=upload_subfolder,
+            overwrite=overwrite,
+        )
+
+    @cached_property
+    @trace_io(level=logging.DEBUG)
+    def expression_preset(self) -> Dict[str, Any]:
+        sec = self.raw.get("expression_preset")
+        if not isinstance(sec, dict):
+            raise ValueError("Missing 'expression_preset' section (must be mapping)")
+
+        node_id = _require_str(sec, "node_id", "expression_preset")
+        input_name = _optional_str(sec, "expression_input_name", "expression")
+
+        expressions_raw = sec.get("expressions")
+        if not isinstance(expressions_raw, list):
+            raise ValueError("expression_preset.expressions must be a list of strings")
+
+        expressions = normalize_expressions(expressions_raw)
+        if not expressions:
+            raise ValueError(
+                "expression_preset.expressions must contain at least one expression"
+            )
+
+        mapping = ExpressionPresetNodeMapping(
+            node_id=node_id, expression_input_name=input_name
+        )
+        mapping.validate()
+
+        return {"mapping": mapping, "expressions": expressions}
+
+    @cached_property
+    @trace_io(level=logging.DEBUG)
+    def save_image(self) -> Dict[str, Any]:
+        sec = self.raw.get("save_image", {})
+        if sec is None:
+            sec = {}
+        if not isinstance(sec, dict):
+            raise ValueError("save_image must be mapping when specified")
+
+        template = _optional_str(
+            sec, "filename_prefix_template", "{image}/{expr}/{run}/img"
+        )
+
+        nodes_raw = sec.get("save_image_nodes")
+        nodes: list[dict[str, str]] = []
+
+        # save_image_nodes は「指定されていれば list」として読む（無指定なら空でOK）
+        if nodes_raw is not None:
+            if not isinstance(nodes_raw, list):
+                raise ValueError(
+                    "save_image.save_image_nodes must be a list when specified"
+                )
+
+            for i, ent in enumerate(nodes_raw):
+                if not isinstance(ent, dict):
+                    raise ValueError(
+                        f"save_image.save_image_nodes[{i}] must be mapping"
+                    )
+
+                node_id = ent.get("node_id")
+                node_id = node_id.strip() if isinstance(node_id, str) else ""
+                if not node_id:
+                    raise ValueError(
+                        f"save_image.save_image_nodes[{i}].node_id must be non-empty string"
+                    )
+
+                suffix = ent.get("suffix", "")
+                if suffix is None:
+                    suffix = ""
+                if not isinstance(suffix, str):
+                    raise ValueError(
+                        f"save_image.save_image_nodes[{i}].suffix must be string when specified"
+                    )
+
+                nodes.append(
+                    {
+                        "node_id": node_id,
+                        "suffix": suffix.strip(),
+                    }
+                )
+
+        return {
+            "nodes": nodes,  # ← 単数node_idは廃止。常にnodes。
+            "filename_prefix_template": template,
+        }
+
+    @cached_property
+    @trace_io(level=logging.DEBUG)
+    def seed_node(self) -> Dict[str, Any]:
+        sec = self.raw.get("seed_node", {})
+        if sec is None:
+            sec = {}
+        if not isinstance(sec, dict):
+            raise ValueError("seed_node must be mapping when specified")
+
+        node_id = sec.get("node_id")
+        if node_id is None:
+            return {"node_id": None, "input_name": "seed"}
+
+        node_id = node_id.strip() if isinstance(node_id, str) else ""
+        if not node_id:
+            raise ValueError(
+                "seed_node.node_id must be non-empty string when specified"
+            )
+
+        input_name = _optional_str(sec, "input_name", "seed")
+        return {"node_id": node_id, "input_name": input_name}
+
+    @cached_property
+    @trace_io(level=logging.DEBUG)
+    def run(self) -> EPBRunConfig:
+        run = self.raw.get("run", {})
+        if run is None:
+            run = {}
+        if not isinstance(run, dict):
+            raise ValueError("run must be mapping when specified")
+
+        comfy_url = (
+            _require_str(self.raw, "comfy_url", "root")
+            if "comfy_url" in self.raw
+            else _require_str(run, "comfy_url", "run")
+        )
+        repeats = _optional_num(run, "repeats", 1, _INT_TYPES)
+        poll_interval = _optional_num(run, "poll_interval", 1.0, _NUM_TYPES)
+        max_poll_interval = _optional_num(run, "max_poll_interval", 16.0, _NUM_TYPES)
+        pipeline_depth = _optional_num(run, "pipeline_depth", 4, _INT_TYPES)
+        upload_workers = _optional_num(run, "upload_workers", 8, _INT_TYPES)
+        save_history = _optional_bool(run, "save_history", False)
+
+        timeout_sec_val = run.get("timeout_sec", 600.0)
+        if timeout_sec_val is None:
+            timeout_sec = None
+        else:
+            if not isinstance(timeout_sec_val, _NUM_TYPES):
+                raise ValueError("run.timeout_sec must be number or null")
+            timeout_sec = float(timeout_sec_val)
+
+        seed_strategy = _optional_str(run, "seed_strategy", "time")
+        seed_base = _optional_num(run, "seed_base", 0, _INT_TYPES)
+
+        return EPBRunConfig(
+            comfy_url=comfy_url,
+            poll_interval=poll_interval,
+            max_poll_interval=max_poll_interval,
+            timeout_sec=timeout_sec,
+            repeats=repeats,
+            pipeline_depth=pipeline_depth,
+            upload_workers=upload_workers,
+            save_history=save_history,
+            seed_strategy=seed_strategy,
+            seed_base=seed_base,
+        )
+
+    @cached_property
+    @trace_io(level=logging.DEBUG)
+    def sampler_node(self) -> Dict[str, Any]:
+        sec = self.raw.get("sampler_node", {})
+        if sec is None:
+            sec = {}
+        if not isinstance(sec, dict):
+            raise ValueError("sampler_node must be mapping when specified")
+
+        node_id = sec.get("node_id")
+        if node_id is None:
+            # sampler差し替え無効（＝既存挙動）
+            return {"node_id": None}
+
+        node_id = node_id.strip() if isinstance(node_id, str) else ""
+        if not node_id:
+            raise ValueError(
+                "sampler_node.node_id must be non-empty string when specified"
+            )
+
+        return {
+            "node_id": node_id,
+            "steps_input": _optional_str(sec, "steps_input", "steps"),
+            "cfg_input": _optional_str(sec, "cfg_input", "cfg"),
+            "denoise_input": _optional_str(sec, "denoise_input", "denoise"),
+            "sampler_name_input": _optional_str(
+                sec, "sampler_name_input", "sampler_name"
+            ),
+            "scheduler_input": _optional_str(sec, "scheduler_input", "scheduler"),
+        }
+
+    @cached_property
+    @trace_io(level=logging.DEBUG)
+    def sampler_sweep(self) -> Optional[Dict[str, Any]]:
+        sec = self.raw.get("sampler_sweep")
+        if sec is None:
+            return None
+        if not isinstance(sec, dict):
+            raise ValueError("sampler_sweep must be mapping when specified")
+
+        # “指定されたら必須キーは全部 list で” ルール（取りこぼし事故防止）
+        # 各リストは検証と変換を1回の走査で行う
+        return {
+            "steps": _sweep_int_list(sec.get("steps"), "sampler_sweep.steps"),
+            "cfg": _sweep_num_list(sec.get("cfg"), "sampler_sweep.cfg"),
+            "denoise": _sweep_num_list(sec.get("denoise"), "sampler_sweep.denoise"),
+            "sampler": _sweep_str_list(sec.get("sampler"), "sampler_sweep.sampler"),
+            "scheduler": _sweep_str_list(
+                sec.get("scheduler"), "sampler_sweep.scheduler"
+            ),
+        }
+
+    # load_* は従来のAPI。各セクションは初回アクセス時に1回だけ読み込まれ、
+    # 以降は同じインスタンスからキャッシュ済みの結果を返す
+    @trace_io(level=logging.DEBUG)
+    def load_workflow(self) -> EPBWorkflowRef:
+        return self.workflow
+
+    @trace_io(level=logging.DEBUG)
+    def load_input_image(self) -> EPBInputImageConfig:
+        return self.input_image
+
+    @trace_io(level=logging.DEBUG)
+    def load_expression_preset(self) -> Dict[str, Any]:
+        return self.expression_preset
+
+    @trace_io(level=logging.DEBUG)
+    def load_save_image(self) -> Dict[str, Any]:
+        return self.save_image
+
+    @trace_io(level=logging.DEBUG)
+    def load_seed_node(self) -> Dict[str, Any]:
+        return self.seed_node
+
+    @trace_io(level=logging.DEBUG)
+    def load_run(self) -> EPBRunConfig:
+        return self.run
+
+    @trace_io(level=logging.DEBUG)
+    def load_sampler_node(self) -> Dict[str, Any]:
+        return self.sampler_node
+
+    @trace_io(level=logging.DEBUG)
+    def load_sampler_sweep(self) -> Optional[Dict[str, Any]]:
+        return self.sampler_sweep
+
+    @trace_io(level=logging.DEBUG)
+    def load_all(self) -> Dict[str, Any]:
+        workflow = self.workflow
+        input_image = self.input_image
+        ep = self.expression_preset
+        save_image = self.save_image
+        seed_node = self.seed_node
+        sampler_node = self.sampler_node
+        sampler_sweep = self.sampler_sweep
+        run = self.run
+
+        return {
+            "workflow": workflow,
+            "run": run,
+            "input_image": input_image,
+            "expression_preset": ep["mapping"],
+            "expressions": ep["expressions"],
+            "save_image": save_image,
+            "seed_node": seed_node,
+            "sampler_node": sampler_node,
+            "sampler_sweep": sampler_sweep,
+            "output_root": workflow.output_root,
+        }
+
+
+def _freeze(value: Any) -> Any:  # pylint: disable=missing-trace-io
+    # 設定値の木を読み取り専用にする（dict -> MappingProxyType, list -> tuple）。
+    # dataclass は frozen なのでそのまま返す
+    if type(value) is dict:
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if type(value) is list:
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+# quick_load の結果 {絶対パス: ((mtime_ns, サイズ), 読み込み結果)}
+_QUICK_LOAD_CACHE: Dict[str, Tuple[Tuple[int, int], Mapping[str, Any]]] = {}
+# 複数スレッドから同じ設定を読んでも解析が1回で済むよう、確認と格納をまとめて保護する
+_QUICK_LOAD_LOCK = threading.Lock()
+
+
+@trace_io(level=logging.DEBUG)
+def quick_load(config_path: Path) -> Mapping[str, Any]:
+    # ファイルが更新されていなければ前回の読み込み結果を使い回す。
+    # 呼び出し元同士で共有されるため、入れ子の dict/list まで読み取り専用にして返す
+    st = config_path.stat()
+    key = str(config_path.resolve())
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _QUICK_LOAD_LOCK:
+        cached = _QUICK_LOAD_CACHE.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        loaded = _freeze(ConfigLoader(config_path).load_all())
+        _QUICK_LOAD_CACHE[key] = (stamp, loaded)
+        return loaded
+
+
+# 呼ばれるのはテストや設定の再読み込み時だけなので trace_io は付けない
+def _quick_load_cache_clear() -> None:  # pylint: disable=missing-trace-io
+    # 読み込み中の quick_load と競合しないよう、同じロックの中で消す
+    with _QUICK_LOAD_LOCK:
+        _QUICK_LOAD_CACHE.clear()
+
+
+quick_load.cache_clear = _quick_load_cache_clear  # type: ignore[attr-defined]
@@ -1,334 +1,257 @@
-# src/expression_preset_batch/config/workflow.py
-
-from __future__ import annotations
-
-import copy
-import json
-import logging
-from dataclasses import dataclass
-from pathlib import Path
-from typing import Any, Dict, Optional
-
-from dtrace_loging.logging.trace import trace_io
-from expression_preset_batch.models import (
-    ExpressionPresetNodeMapping,
-    GenerationParams,
-    SamplerParams,
-)
-
-logger = logging.getLogger(__name__)
-
-Workflow = Dict[str, Any]
-
-
-@trace_io(level=logging.DEBUG)
-def load_workflow_from_file(json_path: Path) -> Workflow:
-    if not json_path.exists():
-        raise FileNotFoundError(f"Workflow JSON not found: {json_path}")
-
-    try:
-        with json_path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Workflow JSON parse error: {json_path}: {e}") from e
-
-    if not isinstance(data, dict):
-        raise ValueError(f"Workflow JSON root must be dict: {json_path}")
-
-    return data
-
-
-@dataclass
-class EPBWorkflowManager:
-    """
-    expression_preset_batch 用 Workflow Manager（拡張版・B案）
-
-    - ベースworkflowをロードして保持
-    - 実行毎に deepcopy して投入用workflowを作る
-    - 差し替え対象:
-        1) 入力画像（LoadImage等）: inputs[input_image_input_name]
-        2) ExpressionPresetNode: inputs[expression_input_name]
-        3) seed（任意）: inputs[seed_input_name]
-        4) SaveImage filename_prefix（任意）: inputs["filename_prefix"]
-
-    安全策:
-    - 差し替え対象の inputs[...] がset_filename_prefix list（リンク）なら上書きしない（warnしてスキップ）
-    """
-
-    workflow_json: Path
-    expression_node: ExpressionPresetNodeMapping
-
-    input_image_node_id: str
-    input_image_input_name: str = "image"
-
-    # save_image_node_id: Optional[str] = None
-    # save_image_node_id: list[dict[str, str]] | None = None
-    save_image_nodes: list[dict[str, str]] | None = None
-    seed_node_id: Optional[str] = None
-    seed_input_name: str = "seed"
-
-    # 追加：Sampler node（任意）
-    sampler_node_id: Optional[str] = None
-    steps_input_name: str = "steps"
-    cfg_input_name: str = "cfg"
-    denoise_input_name: str = "denoise"
-    sampler_name_input_name: str = "sampler_name"
-    scheduler_input_name: str = "scheduler"
-
-    @trace_io(level=logging.DEBUG)
-    def __post_init__(self) -> None:
-        self.base_workflow: Workflow = load_workflow_from_file(self.workflow_json)
-        self.validate(self.base_workflow)
-
-    @trace_io(level=logging.DEBUG)
-    def get_base_workflow(self) -> Workflow:
-        return copy.deepcopy(self.base_workflow)
-
-    @trace_io(level=logging.DEBUG)
-    def create_workflow(
-        self, params: GenerationParams, *, input_image_filename: str
-    ) -> Workflow:
-        wf = self.get_base_workflow()
-
-        # 1) 入力画像
-        self.set_input_image_filename(wf, input_image_filename)
-
-        # 2) expression
-        self.apply_expression(wf, params.expression)
-
-        # 3) seed（設定がある場合のみ）
-        if self.seed_node_id is not None:
-            self.set_seed(wf, params.seed)
-
-        # 4) filename_prefix（設定がある場合のみ）
-        # if self.save_image_node_id is not None:
-        if self.save_image_nodes:
-            self.set_filename_prefix(wf, params.filename_prefix)
-
-        # 5) sampler params（設定がある場合のみ）
-        if self.sampler_node_id is not None and params.sampler is not None:
-            self.apply_sampler_params(wf, params.sampler)
-
-        return wf
-
-    @trace_io(level=logging.DEBUG)
-    def set_input_image_filename(self, workflow: Workflow, filename: str) -> None:
-        node = self.get_node_info(workflow, self.input_image_node_id)
-        if node is None:
-            logger.warning(
-                "Input image node not found. node_id=%s", self.input_image_node_id
-            )
-            return
-
-        inputs = node.get("inputs")
-        if not isinstance(inputs, dict):
-            logger.warning(
-                "Input image node inputs invalid. node_id=%s", self.input_image_node_id
-            )
-            return
-
-        key = self.input_image_input_name
-        existing = inputs.get(key)
-
-        if isinstance(existing, list):
-            logger.warning(
-                "Skip overwriting input image because it is a link(list). "
-                "node_id=%s input=%s existing=%r",
-                self.input_image_node_id,
-                key,
-                existing,
-            )
-            return
-
-        inputs[key] = filename
-
-    @trace_io(level=logging.DEBUG)
-    def apply_expression(self, workflow: Workflow, expression: str) -> None:
-        node = self.get_node_info(workflow, self.expression_node.node_id)
-        if node is None:
-            logger.warning(
-                "Expression node not found. node_id=%s", self.expression_node.node_id
-            )
-            return
-
-        inputs = node.get("inputs")
-        if not isinstance(inputs, dict):
-            logger.warning(
-                "Expression node inputs invalid. node_id=%s",
-                self.expression_node.node_id,
-            )
-            return
-
-        key = self.expression_node.expression_input_name
-        existing = inputs.get(key)
-
-        if isinstance(existing, list):
-            logger.warning(
-                "Skip overwriting expression because it is a link(list). "
-                "node_id=%s input=%s existing=%r",
-                self.expression_node.node_id,
-                key,
-                existing,
-            )
-            return
-
-        inputs[key] = expression
-
-    @trace_io(level=logging.DEBUG)
-    def set_seed(self, workflow: Workflow, seed: int) -> None:
-        if not self.seed_node_id:
-            return
-
-        node = self.get_node_info(workflow, self.seed_node_id)
-        if node is None:
-            logger.warning("Seed node not found. node_id=%s", self.seed_node_id)
-            return
-
-        inputs = node.get("inputs")
-        if not isinstance(inputs, dict):
-            logger.warning("Seed node inputs invalid. node_id=%s", self.seed_node_id)
-            return
-
-        key = self.seed_input_name
-        existing = inputs.get(key)
-
-        if isinstance(existing, list):
-            logger.warning(
-                "Skip overwriting seed because it is a link(list). "
-                "node_id=%s input=%s existing=%r",
-                self.seed_node_id,
-                key,
-                existing,
-            )
-            return
-
-        inputs[key] = int(seed)
-
-    @trace_io(level=logging.DEBUG)
-    def set_filename_prefix(self, workflow: Workflow, prefix: str) -> None:
-        nodes = self.save_image_nodes or []
-        if not nodes:
-            return
-
-        for entry in nodes:
-            node_id = entry.get("node_id")
-            if not node_id:
-                continue
-
-            suffix = entry.get("suffix")
-            final_prefix = f"{prefix}_{suffix}" if suffix else prefix
-
-            node = self.get_node_info(workflow, node_id)
-            if node is None:
-                logger.warning("SaveImage node not found. node_id=%s", node_id)
-                continue
-
-            inputs = node.get("inputs")
-            if not isinstance(inputs, dict):
-                logger.warning("SaveImage node inputs invalid. node_id=%s", node_id)
-                continue
-
-            existing = inputs.get("filename_prefix")
-            if isinstance(existing, list):
-                logger.warning(
-                    "Skip overwriting filename_prefix because it is a link(list). "
-                    "node_id=%s existing=%r",
-                    node_id,
-                    existing,
-                )
-                continue
-
-            inputs["filename_prefix"] = final_prefix
-
-    @trace_io(level=logging.DEBUG)
-    def validate(self, workflow: Optional[Workflow] = None) -> bool:
-        wf = workflow if workflow is not None else self.base_workflow
-        ok = True
-
-        # input image
-        if self.get_node_info(wf, self.input_image_node_id) is None:
-            logger.error(
-                "Input image node missing: node_id=%s", self.input_image_node_id
-            )
-            ok = False
-
-        # expression
-        expr_node = self.get_node_info(wf, self.expression_node.node_id)
-        if expr_node is None:
-            logger.error(
-                "Expression node missing: node_id=%s", self.expression_node.node_id
-            )
-            ok = False
-
-        # save image (optional)
-        if (
-            self.save_image_nodes
-            and self.get_node_info(wf, self.save_image_nodes[0].get("node_id")) is None
-        ):
-            logger.error(
-                "SaveImage node missing: node_id=%s",
-                self.save_image_nodes[0].get("node_id"),
-            )
-            ok = False
-
-        # seed (optional)
-        if self.seed_node_id and self.get_node_info(wf, self.seed_node_id) is None:
-            logger.error("Seed node missing: node_id=%s", self.seed_node_id)
-            ok = False
-
-        return ok
-
-    @trace_io(level=logging.DEBUG)
-    def save_workflow(self, workflow: Workflow, path: Path) -> None:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("w", encoding="utf-8") as f:
-            json.dump(workflow, f, ensure_ascii=False, indent=2)
-
-    @staticmethod
-    @trace_io(level=logging.DEBUG)
-    def get_node_info(workflow: Workflow, node_id: str) -> Optional[Dict[str, Any]]:
-        node = workflow.get(node_id)
-        if node is None:
-            return None
-        if not isinstance(node, dict):
-            logger.warning(
-                "Node is not a dict. node_id=%s type=%s", node_id, type(node)
-            )
-            return None
-        return node
-
-    @trace_io(level=logging.DEBUG)
-    def apply_sampler_params(self, workflow: Workflow, sp: SamplerParams) -> None:
-        if not self.sampler_node_id:
-            return
-
-        node = self.get_node_info(workflow, self.sampler_node_id)
-        if node is None:
-            logger.warning("Sampler node not found. node_id=%s", self.sampler_node_id)
-            return
-
-        inputs = node.get("inputs")
-        if not isinstance(inputs, dict):
-            logger.warning(
-                "Sampler node inputs invalid. node_id=%s", self.sampler_node_id
-            )
-            return
-
-        @trace_io(level=logging.DEBUG)
-        def _set(key: str, value):
-            existing = inputs.get(key)
-            if isinstance(existing, list):
-                logger.warning(
-                    "Skip overwriting sampler param because it is a link(list). node_id=%s input=%s existing=%r",  # noqa: E501
-                    self.sampler_node_id,
-                    key,
-                    existing,
-                )
-                return
-            inputs[key] = value
-
-        _set(self.steps_input_name, int(sp.steps))
-        _set(self.cfg_input_name, float(sp.cfg))
-        _set(self.denoise_input_name, float(sp.denoise))
-        _set(self.sampler_name_input_name, str(sp.sampler_name))
-        _set(self.scheduler_input_name, str(sp.scheduler))
+# src/expression_preset_batch/config/workflow.py
+
+from __future__ import annotations
+
+import copy
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from comfytools.utils import loads_json, write_json
+from dtrace_loging.logging.trace import trace_io
+from expression_preset_batch.models import (
+    ExpressionPresetNodeMapping,
+    GenerationParams,
+)
+
+logger = logging.getLogger(__name__)
+
+Workflow = Dict[str, Any]
+
+
+@trace_io(level=logging.DEBUG)
+def load_workflow_from_file(json_path: Path) -> Workflow:
+    # 事前の exists() は stat が1回増えるだけなので、
+    # open の失敗で存在しないことを判定する
+    try:
+        data = loads_json(json_path.read_bytes())
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Workflow JSON not found: {json_path}") from e
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Workflow JSON parse error: {json_path}: {e}") from e
+
+    if not isinstance(data, dict):
+        raise ValueError(f"Workflow JSON root must be dict: {json_path}")
+
+    return data
+
+
+@dataclass
+class EPBWorkflowManager:
+    """
+    expression_preset_batch 用 Workflow Manager（拡張版・B案）
+
+    - ベースworkflowをロードして保持
+    - 実行毎に差し替え対象のノードだけを複製して投入用workflowを作る
+      （それ以外のノードはベースworkflowと共有する）
+    - 差し替え対象:
+        1) 入力画像（LoadImage等）: inputs[input_image_input_name]
+        2) ExpressionPresetNode: inputs[expression_input_name]
+        3) seed（任意）: inputs[seed_input_name]
+        4) SaveImage filename_prefix（任意）: inputs["filename_prefix"]
+
+    安全策:
+    - 差し替え対象の inputs[...] がset_filename_prefix list（リンク）なら上書きしない（warnしてスキップ）
+    """
+
+    workflow_json: Path
+    expression_node: ExpressionPresetNodeMapping
+
+    input_image_node_id: str
+    input_image_input_name: str = "image"
+
+    # save_image_node_id: Optional[str] = None
+    # save_image_node_id: list[dict[str, str]] | None = None
+    save_image_nodes: list[dict[str, str]] | None = None
+    seed_node_id: Optional[str] = None
+    seed_input_name: str = "seed"
+
+    # 追加：Sampler node（任意）
+    sampler_node_id: Optional[str] = None
+    steps_input_name: str = "steps"
+    cfg_input_name: str = "cfg"
+    denoise_input_name: str = "denoise"
+    sampler_name_input_name: str = "sampler_name"
+    scheduler_input_name: str = "scheduler"
+
+    @trace_io(level=logging.DEBUG)
+    def __post_init__(self) -> None:
+        self.base_workflow: Workflow = load_workflow_from_file(self.workflow_json)
+        self.validate(self.base_workflow)
+
+        # create_workflow で書き換える入力
+        self._targets = self._build_targets()
+        # 同じ内容をノード単位にまとめたもの
+        # （ノードごとに複製と書き換えを1回で済ませる）
+        plan: Dict[str, List[Tuple[str, str, str]]] = {}
+        for node_id, key, tag, suffix in self._targets:
+            plan.setdefault(node_id, []).append((key, tag, suffix))
+        self._plan = tuple((node_id, tuple(w)) for node_id, w in plan.items())
+
+    @trace_io(level=logging.DEBUG)
+    def _build_targets(self) -> Tuple[Tuple[str, str, str, str], ...]:
+        """
+        create_workflow の差し替え先を (node_id, 入力名, 値の種類, suffix) に解決する
+
+        ノードの存在・inputs の形・リンク(list)かどうかはベースworkflowに対して
+        ここで1回だけ確認し、書き換えられないものは警告を出して差し替え対象から外す。
+        """
+        wanted: List[Tuple[str, str, str, str]] = [
+            (self.input_image_node_id, self.input_image_input_name, "image", ""),
+            (
+                self.expression_node.node_id,
+                self.expression_node.expression_input_name,
+                "expression",
+                "",
+            ),
+        ]
+        if self.seed_node_id:
+            wanted.append((self.seed_node_id, self.seed_input_name, "seed", ""))
+        for entry in self.save_image_nodes or []:
+            node_id = entry.get("node_id")
+            if node_id:
+                suffix = entry.get("suffix") or ""
+                wanted.append((node_id, "filename_prefix", "filename_prefix", suffix))
+        if self.sampler_node_id:
+            wanted.extend(
+                (self.sampler_node_id, key, tag, "")
+                for key, tag in (
+                    (self.steps_input_name, "steps"),
+                    (self.cfg_input_name, "cfg"),
+                    (self.denoise_input_name, "denoise"),
+                    (self.sampler_name_input_name, "sampler_name"),
+                    (self.scheduler_input_name, "scheduler"),
+                )
+            )
+
+        targets: List[Tuple[str, str, str, str]] = []
+        for target in wanted:
+            node = self.get_node_info(self.base_workflow, target[0])
+            if node is None or not isinstance(node.get("inputs"), dict):
+                logger.warning(
+                    "Target node not found or inputs invalid. node_id=%s input=%s",
+                    target[0],
+                    target[1],
+                )
+                continue
+            existing = node["inputs"].get(target[1])
+            if isinstance(existing, list):
+                logger.warning(
+                    "Skip overwriting %s because it is a link(list). "
+                    "node_id=%s input=%s existing=%r",
+                    target[2],
+                    target[0],
+                    target[1],
+                    existing,
+                )
+                continue
+            targets.append(target)
+        return tuple(targets)
+
+    # 戻り値が workflow 全体で、ログに出すと重いだけなので trace_io は付けない
+    def get_base_workflow(self) -> Workflow:  # pylint: disable=missing-trace-io
+        return copy.deepcopy(self.base_workflow)
+
+    @trace_io(level=logging.DEBUG)
+    def create_workflow(
+        self, params: GenerationParams, *, input_image_filename: str
+    ) -> Workflow:
+        values = self._patch_values(params, input_image_filename)
+
+        # 差し替え先は __post_init__ で解決・検証済み（リンクは除外済み）なので、
+        # 対象ノードだけ node/inputs を浅く複製し、その場で書き込む
+        # それ以外のノードはベースworkflowと共有するため、
+        # 投入用workflowは読み取り専用で扱うこと
+        wf = dict(self.base_workflow)
+        for node_id, writes in self._plan:
+            node = wf[node_id]
+            inputs = dict(node["inputs"])
+            for key, tag, suffix in writes:
+                if tag not in values:
+                    continue
+                value = values[tag]
+                inputs[key] = f"{value}_{suffix}" if suffix else value
+            wf[node_id] = {**node, "inputs": inputs}
+
+        return wf
+
+    # 実行毎に呼ばれる小さな関数なので trace_io は付けない
+    def _patch_values(  # pylint: disable=missing-trace-io
+        self, params: GenerationParams, input_image_filename: str
+    ) -> Dict[str, Any]:
+        # 値の種類 -> 設定する値
+        # （seed/sampler/SaveImage は対象ノードがある場合のみ使う）
+        values: Dict[str, Any] = {
+            "image": input_image_filename,
+            "expression": params.expression,
+            "seed": int(params.seed),
+            "filename_prefix": params.filename_prefix,
+        }
+        sp = params.sampler
+        if sp is not None:
+            values["steps"] = int(sp.steps)
+            values["cfg"] = float(sp.cfg)
+            values["denoise"] = float(sp.denoise)
+            values["sampler_name"] = str(sp.sampler_name)
+            values["scheduler"] = str(sp.scheduler)
+        return values
+
+    @trace_io(level=logging.DEBUG)
+    def validate(self, workflow: Optional[Workflow] = None) -> bool:
+        wf = workflow if workflow is not None else self.base_workflow
+        ok = True
+
+        # input image
+        if self.get_node_info(wf, self.input_image_node_id) is None:
+            logger.error(
+                "Input image node missing: node_id=%s", self.input_image_node_id
+            )
+            ok = False
+
+        # expression
+        expr_node = self.get_node_info(wf, self.expression_node.node_id)
+        if expr_node is None:
+            logger.error(
+                "Expression node missing: node_id=%s", self.expression_node.node_id
+            )
+            ok = False
+
+        # save image (optional)
+        if (
+            self.save_image_nodes
+            and self.get_node_info(wf, self.save_image_nodes[0].get("node_id")) is None
+        ):
+            logger.error(
+                "SaveImage node missing: node_id=%s",
+                self.save_image_nodes[0].get("node_id"),
+            )
+            ok = False
+
+        # seed (optional)
+        if self.seed_node_id and self.get_node_info(wf, self.seed_node_id) is None:
+            logger.error("Seed node missing: node_id=%s", self.seed_node_id)
+            ok = False
+
+        return ok
+
+    @trace_io(level=logging.DEBUG)
+    def save_workflow(self, workflow: Workflow, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_json(path, workflow)
+
+    # ノード参照のたびに呼ばれる小さな関数なので trace_io は付けない
+    @staticmethod
+    def get_node_info(  # pylint: disable=missing-trace-io
+        workflow: Workflow, node_id: str
+    ) -> Optional[Dict[str, Any]]:
+        node = workflow.get(node_id)
+        if node is None:
+            return None
+        if not isinstance(node, dict):
+            logger.warning(
+                "Node is not a dict. node_id=%s type=%s", node_id, type(node)
+            )
+            return None
+        return node
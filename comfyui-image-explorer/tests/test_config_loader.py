@@ -0,0 +1,76 @@
+"""expression_preset_batch の quick_load のテスト"""
+
+import os
+import re
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from expression_preset_batch.config.config_loader import quick_load
+
+EXAMPLE_CONFIG = Path(__file__).resolve().parents[1] / "config" / "epb.yaml"
+
+
+@pytest.fixture
+def config_path(tmp_path: Path) -> Iterator[Path]:
+    # サンプル設定のパスだけ tmp_path 配下に差し替えて使う
+    workflow_json = tmp_path / "workflow.json"
+    workflow_json.write_text("{}", encoding="utf-8")
+    text = EXAMPLE_CONFIG.read_text(encoding="utf-8")
+    text = re.sub(
+        r"(?m)^workflow_json:.*$", f'workflow_json: "{workflow_json.as_posix()}"', text
+    )
+    text = re.sub(
+        r"(?m)^output_root:.*$", f'output_root: "{(tmp_path / "out").as_posix()}"', text
+    )
+    path = tmp_path / "epb.yaml"
+    path.write_text(text, encoding="utf-8")
+
+    quick_load.cache_clear()
+    yield path
+    quick_load.cache_clear()
+
+
+def test_quick_load_returns_cached_result(config_path: Path):
+    assert quick_load(config_path) is quick_load(config_path)
+
+
+def test_quick_load_reloads_after_file_change(config_path: Path):
+    first = quick_load(config_path)
+
+    text = config_path.read_text(encoding="utf-8")
+    config_path.write_text(
+        text.replace('comfy_url: "http://127.0.0.1:8188"', 'comfy_url: "http://h:1"'),
+        encoding="utf-8",
+    )
+    # 同じ時刻に収まっても再読み込みされるよう、mtime を確実に進める
+    st = config_path.stat()
+    os.utime(config_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    second = quick_load(config_path)
+    assert second is not first
+    assert first["run"].comfy_url == "http://127.0.0.1:8188"
+    assert second["run"].comfy_url == "http://h:1"
+
+
+def test_quick_load_cache_clear(config_path: Path):
+    first = quick_load(config_path)
+    quick_load.cache_clear()
+
+    assert quick_load(config_path) is not first
+
+
+def test_quick_load_result_is_read_only(config_path: Path):
+    config = quick_load(config_path)
+
+    with pytest.raises(TypeError):
+        config["output_root"] = None
+    with pytest.raises(TypeError):
+        config["save_image"]["filename_prefix_template"] = "x"
+    with pytest.raises(TypeError):
+        config["save_image"]["nodes"][0]["suffix"] = "x"
+    with pytest.raises(TypeError):
+        config["sampler_sweep"]["steps"][0] = 1
+    with pytest.raises(AttributeError):
+        config["expressions"].append("x")
@@ -0,0 +1,90 @@
+"""組み合わせの列挙と件数計算のテスト"""
+
+import itertools
+
+import pytest
+
+from comfytools.core_models import PromptAxis, PromptTemplate
+from comfytools.utils import iter_combinations
+from image_explorer.prompt_builder import (
+    ParameterCombinationGenerator,
+    PromptBuilder,
+)
+
+
+def make_template() -> PromptTemplate:
+    return PromptTemplate(
+        fixed_positive=["masterpiece", "1girl"],
+        axes=[
+            PromptAxis(name="hair_style", choices=["long hair", "short hair", "bob"]),
+            PromptAxis(name="expression", choices=["smile", "angry"]),
+            PromptAxis(name="pose", choices=["standing"]),
+        ],
+        negative=["lowres"],
+    )
+
+
+SAMPLER_SINGLE = {
+    "steps": [20],
+    "cfg": [7.0],
+    "sampler_name": ["euler"],
+    "scheduler": ["normal"],
+}
+SAMPLER_MULTI = {
+    "steps": [20, 30],
+    "cfg": [5.0, 7.0, 9.0],
+    "sampler_name": ["euler", "dpmpp_2m"],
+    "scheduler": ["normal"],
+}
+LORA_SINGLE = {
+    "names": ["a.safetensors"],
+    "model_strength": [1.0],
+    "clip_strength": [1.0],
+}
+LORA_MULTI = {
+    "names": ["a.safetensors", "b.safetensors"],
+    "model_strength": [0.5, 1.0],
+    "clip_strength": [1.0],
+}
+
+
+@pytest.mark.parametrize("sampler_choices", [SAMPLER_SINGLE, SAMPLER_MULTI])
+@pytest.mark.parametrize("lora_choices", [LORA_SINGLE, LORA_MULTI])
+@pytest.mark.parametrize("target_axis_name", ["hair_style", "expression", "pose"])
+def test_count_combinations_matches_generated(
+    sampler_choices, lora_choices, target_axis_name
+):
+    builder = PromptBuilder(make_template(), seed=0)
+    generator = ParameterCombinationGenerator(builder, sampler_choices, lora_choices)
+
+    generated = list(generator.generate_combinations(target_axis_name))
+
+    assert generator.count_combinations(target_axis_name) == len(generated)
+
+
+def test_count_combinations_unknown_axis():
+    builder = PromptBuilder(make_template(), seed=0)
+    generator = ParameterCombinationGenerator(builder, SAMPLER_SINGLE, LORA_SINGLE)
+
+    with pytest.raises(ValueError):
+        generator.count_combinations("unknown")
+
+
+@pytest.mark.parametrize(
+    "pools",
+    [
+        [(1, 2), ("a", "b")],
+        [(1, 2, 3), ("a",), (True, False), (0.5, 1.0, 1.5, 2.0)],
+        [("only",)],
+        [(1, 2), ()],
+        [],
+    ],
+)
+def test_iter_combinations_matches_product(pools):
+    assert list(iter_combinations(pools)) == list(itertools.product(*pools))
+
+
+def test_iter_combinations_is_reusable():
+    pools = [(1, 2), ("a", "b", "c")]
+
+    assert list(iter_combinations(pools)) == list(iter_combinations(pools))